@@ -9,13 +9,14 @@ Based on component testing results:
 """
 
 import sounddevice as sd
+import math
 import numpy as np
 import time
 import sys
 import signal
-import gc
+import queue
+import threading
 import subprocess
-import tempfile
 import json
 from pathlib import Path
 from datetime import datetime
@@ -23,9 +24,76 @@ from enum import Enum
 
 sys.path.insert(0, '.')
 from sales_coach.src.models.config import load_config
+from sales_coach.src.audio.buffer_pool import Float32BufferPool
+from sales_coach.src.audio.capture import RingBufferRecorder
 from sales_coach.src.audio.transcription import WhisperTranscriber
+from sales_coach.src.audio.vad import SileroVAD
 from sales_coach.src.models.conversation import ConversationTurn, Speaker
 
+# Coaching LLM worker. It runs in its own process so a crash or hang in the
+# model cannot take the coach down, and stays alive between requests so the
+# model is loaded once. Requests and replies are single JSON lines.
+LLM_WORKER_SCRIPT = '''
+import sys
+import json
+sys.path.insert(0, '.')
+from sales_coach.src.models.config import load_config
+from sales_coach.src.llm.coaching import create_coaching_system
+from sales_coach.src.models.conversation import ConversationTurn, Speaker
+from pathlib import Path
+from datetime import datetime
+
+try:
+    config = load_config(Path("config/default.yaml"))
+    # Use smaller context for stability
+    config.models.llm_context_length = 512
+    config.models.llm_max_tokens = 100
+    
+    coaching_system = create_coaching_system(config.models, config.coaching)
+except Exception as e:
+    print(f"ERROR:{str(e)[:100]}", flush=True)
+    sys.exit(1)
+
+if not coaching_system:
+    print("ERROR:FAILED_TO_LOAD", flush=True)
+    sys.exit(1)
+print("READY", flush=True)
+
+for line in sys.stdin:
+    try:
+        request = json.loads(line)
+        if request.get("reset"):
+            coaching_system.reset()
+            print("RESET", flush=True)
+            continue
+        
+        turn = ConversationTurn(
+            speaker=Speaker.UNKNOWN,
+            text=request["text"],
+            timestamp=datetime.now(),
+            confidence=request["confidence"]
+        )
+        
+        coaching_system.add_conversation_turn(turn)
+        response = coaching_system.force_analysis()
+        
+        if response and response.primary_advice:
+            advice = response.primary_advice
+            result = {
+                "priority": advice.priority.value,
+                "category": advice.category.value,
+                "insight": advice.insight,
+                "suggested_action": advice.suggested_action
+            }
+            print(f"SUCCESS:{json.dumps(result)}", flush=True)
+        else:
+            print("ERROR:NO_ADVICE_GENERATED", flush=True)
+            
+    except Exception as e:
+        print(f"ERROR:{str(e)[:100]}", flush=True)
+'''
+
+
 class CoachingCategory(Enum):
     QUESTIONING = "QUESTIONING"
     LISTENING = "LISTENING"
@@ -61,6 +129,12 @@ class FinalIntegratedCoach:
         self.sample_rate = 16000
         self.chunk_duration = 3
         self.audio_threshold = 0.01  # Higher threshold based on testing
+        # One long-lived input stream; chunks are read back to back from its ring
+        self.recorder = RingBufferRecorder(self.sample_rate)
+        
+        # Pipeline queues: audio chunks -> transcription -> coaching
+        self.audio_q = queue.Queue(maxsize=4)
+        self.text_q = queue.Queue(maxsize=4)
         
         # Initialize transcription
         print("🧠 Loading AI models...")
@@ -70,8 +144,19 @@ class FinalIntegratedCoach:
             sys.exit(1)
         print("   ✅ Speech-to-text ready")
         
+        # Speech gate in front of Whisper: Silero VAD over 32 ms frames, so
+        # room noise that passes the level check is not transcribed
+        self.vad = SileroVAD(self.config.audio)
+        if self.vad.load_model():
+            print("   ✅ Voice activity detection ready")
+        else:
+            print("   ⚠️  Silero VAD unavailable, using the level check only")
+            self.vad = None
+        self.min_voiced_frames = 5
+        
         # LLM coaching - isolated process approach
         self.llm_available = False
+        self.llm_process = None
         self.llm_failures = 0
         self.max_llm_failures = 3
         
@@ -87,6 +172,7 @@ class FinalIntegratedCoach:
         self.chunk_count = 0
         self.transcription_count = 0
         self.coaching_count = 0
+        self.dropped_chunks = 0
         self.session_start = datetime.now()
         
         print("🎤 Enhanced audio detection ready")
@@ -113,48 +199,87 @@ class FinalIntegratedCoach:
             print(f"   ⚠️  Audio device info error: {e}")
     
     def _test_llm_availability(self):
-        """Test if LLM coaching is available via subprocess."""
+        """Start the process-isolated LLM worker; False if the model does not load."""
         try:
-            # Create a simple LLM test script
-            llm_test_script = f'''
-import sys
-sys.path.insert(0, '.')
-from sales_coach.src.models.config import load_config
-from sales_coach.src.llm.coaching import create_coaching_system
-from pathlib import Path
-
-try:
-    config = load_config(Path("config/default.yaml"))
-    # Reduce context to prevent timeout
-    config.models.llm_context_length = 512
-    config.models.llm_max_tokens = 50
-    
-    coaching_system = create_coaching_system(config.models, config.coaching)
-    if coaching_system:
-        print("SUCCESS:LLM_AVAILABLE")
-    else:
-        print("ERROR:LLM_FAILED_TO_LOAD")
-except Exception as e:
-    print(f"ERROR:{{str(e)[:50]}}")
-'''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(llm_test_script)
-                script_path = f.name
-            
-            # Run with timeout
-            result = subprocess.run([
-                sys.executable, script_path
-            ], capture_output=True, text=True, timeout=30)
-            
-            Path(script_path).unlink()  # Cleanup
-            
-            return result.returncode == 0 and "SUCCESS:LLM_AVAILABLE" in result.stdout
-            
+            return self._start_llm_worker()
         except Exception as e:
             print(f"      LLM test error: {e}")
             return False
     
+    def _start_llm_worker(self, timeout=30):
+        """Start the LLM worker process and wait for its model to load."""
+        self.llm_process = subprocess.Popen(
+            [sys.executable, "-c", LLM_WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+        self.llm_replies = queue.Queue()
+        threading.Thread(
+            target=self._read_llm_replies,
+            args=(self.llm_process, self.llm_replies),
+            daemon=True
+        ).start()
+        
+        try:
+            if self.llm_replies.get(timeout=timeout) == "READY":
+                return True
+        except queue.Empty:
+            pass
+        
+        self._stop_llm_worker(force=True)
+        return False
+    
+    @staticmethod
+    def _read_llm_replies(process, replies):
+        """Forward the worker's protocol lines, ignoring any other output."""
+        for line in process.stdout:
+            if line.startswith(("READY", "RESET", "SUCCESS:", "ERROR:")):
+                replies.put(line.strip())
+        replies.put(None)  # Worker exited
+    
+    def _llm_request(self, request, timeout):
+        """Send one request to the worker; None on timeout or if it has died."""
+        if self.llm_process is None:
+            return None
+        
+        try:
+            self.llm_process.stdin.write(json.dumps(request) + "\n")
+            self.llm_process.stdin.flush()
+            return self.llm_replies.get(timeout=timeout)
+        except (OSError, queue.Empty):
+            return None
+    
+    def _stop_llm_worker(self, force=False):
+        """Stop the LLM worker process."""
+        process, self.llm_process = self.llm_process, None
+        if process is None:
+            return
+        
+        if force:
+            process.kill()
+        else:
+            try:
+                process.stdin.close()  # Worker exits at end of input
+            except OSError:
+                pass
+        
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    
+    def _restart_llm_worker(self):
+        """Replace a hung or crashed worker; this reloads the model."""
+        print("   🔄 Restarting LLM coaching process...")
+        self._stop_llm_worker(force=True)
+        if not self._start_llm_worker():
+            print("   ⚠️  LLM coaching process failed to restart")
+            self.llm_available = False
+    
     def _get_coaching_advice(self, text, confidence):
         """Get coaching advice using available method."""
         if self.llm_available and self.llm_failures < self.max_llm_failures:
@@ -172,70 +297,17 @@ except Exception as e:
         return self._rule_based_coaching(text, confidence)
     
     def _try_llm_coaching(self, text, confidence):
-        """Try LLM coaching with subprocess isolation."""
-        try:
-            # Create LLM coaching script
-            coaching_script = f'''
-import sys
-import json
-sys.path.insert(0, '.')
-from sales_coach.src.models.config import load_config
-from sales_coach.src.llm.coaching import create_coaching_system
-from sales_coach.src.models.conversation import ConversationTurn, Speaker
-from pathlib import Path
-from datetime import datetime
-
-try:
-    config = load_config(Path("config/default.yaml"))
-    # Use smaller context for stability
-    config.models.llm_context_length = 512
-    config.models.llm_max_tokens = 100
-    
-    coaching_system = create_coaching_system(config.models, config.coaching)
-    if not coaching_system:
-        print("ERROR:FAILED_TO_LOAD")
-        sys.exit(1)
-    
-    turn = ConversationTurn(
-        speaker=Speaker.UNKNOWN,
-        text="{text}",
-        timestamp=datetime.now(),
-        confidence={confidence}
-    )
-    
-    coaching_system.add_conversation_turn(turn)
-    response = coaching_system.force_analysis()
-    
-    if response and response.primary_advice:
-        advice = response.primary_advice
-        result = {{
-            "priority": advice.priority.value,
-            "category": advice.category.value,
-            "insight": advice.insight,
-            "suggested_action": advice.suggested_action
-        }}
-        print(f"SUCCESS:{{json.dumps(result)}}")
-    else:
-        print("ERROR:NO_ADVICE_GENERATED")
+        """Try LLM coaching on the persistent worker process."""
+        # Each utterance is coached on its own, as when every request got a
+        # fresh process: clear the previous turns (and the periodic analyses
+        # they would trigger) without reloading the weights
+        reply = self._llm_request({"reset": True}, timeout=5)
+        if reply == "RESET":
+            reply = self._llm_request({"text": text, "confidence": confidence}, timeout=15)
         
-except Exception as e:
-    print(f"ERROR:{{str(e)[:100]}}")
-'''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(coaching_script)
-                script_path = f.name
-            
-            # Run with short timeout
-            result = subprocess.run([
-                sys.executable, script_path
-            ], capture_output=True, text=True, timeout=15)
-            
-            Path(script_path).unlink()  # Cleanup
-            
-            if result.returncode == 0 and "SUCCESS:" in result.stdout:
-                json_str = result.stdout.split("SUCCESS:")[1].strip()
-                advice_data = json.loads(json_str)
+        if reply and reply.startswith("SUCCESS:"):
+            try:
+                advice_data = json.loads(reply[len("SUCCESS:"):])
                 
                 return {
                     'priority': CoachingPriority(advice_data['priority']),
@@ -243,11 +315,16 @@ except Exception as e:
                     'insight': advice_data['insight'],
                     'suggested_action': advice_data['suggested_action']
                 }
-            else:
+            except Exception:
                 return None
-                
-        except Exception:
+        
+        if reply and reply.startswith("ERROR:"):
+            # The worker is healthy; the next request starts from a reset anyway
             return None
+        
+        # Timed out or the worker died; only this needs a full reload
+        self._restart_llm_worker()
+        return None
     
     def _rule_based_coaching(self, text, confidence):
         """Fallback rule-based coaching system."""
@@ -305,6 +382,103 @@ except Exception as e:
                 'suggested_action': 'Keep the conversation flowing with open-ended questions and active listening.'
             }
     
+    def _put_latest(self, q, item):
+        """Queue an item, dropping the oldest one if the queue is full."""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.buffer_pool.release(q.get_nowait())
+                    self.dropped_chunks += 1
+                except queue.Empty:
+                    pass
+    
+    def _asr_worker(self):
+        """Transcribe queued audio chunks and pass the text to the coach worker."""
+        pending = None
+        while True:
+            chunks = [pending if pending is not None else self.audio_q.get()]
+            pending = None
+            
+            # Chunks that queued up while the previous call ran are joined
+            # into the same Whisper call, up to one 30 s window
+            total = len(chunks[0]) if chunks[0] is not None else 0
+            while chunks[-1] is not None:
+                try:
+                    chunk = self.audio_q.get_nowait()
+                except queue.Empty:
+                    break
+                added = len(chunk) + self.transcriber.batch_separator_samples if chunk is not None else 0
+                if total + added > self.transcriber.max_batch_samples:
+                    pending = chunk
+                    break
+                chunks.append(chunk)
+                total += added
+            
+            stop = chunks[-1] is None
+            if stop:
+                chunks.pop()
+            if chunks:
+                self._transcribe_chunks(chunks)
+            if stop:
+                self.text_q.put(None)
+                return
+    
+    def _transcribe_chunks(self, chunks):
+        """Transcribe one or more chunks and queue their text for coaching."""
+        try:
+            # Transcribe
+            results = self.transcriber.transcribe_clips(chunks)
+            
+            for result in results:
+                if result and result.text and result.text.strip() and len(result.text.strip()) > 2:
+                    text = result.text.strip()
+                    self.transcription_count += 1
+                    
+                    timestamp = datetime.now().strftime('%H:%M:%S')
+                    word_count = len(text.split())
+                    
+                    print(f"   📝 [{timestamp}] \"{text}\" ({word_count} words)")
+                    print(f"   🎯 Confidence: {result.confidence:.3f}")
+                    
+                    self.text_q.put((text, result.confidence))
+                    
+                else:
+                    print(f"   🔇 Transcription unclear or too short")
+                    
+        except Exception as e:
+            print(f"   ❌ Processing error: {str(e)[:50]}...")
+        finally:
+            for chunk in chunks:
+                self.buffer_pool.release(chunk)
+    
+    def _coach_worker(self):
+        """Produce coaching advice for transcribed text."""
+        while True:
+            item = self.text_q.get()
+            if item is None:
+                return
+            
+            text, confidence = item
+            try:
+                # Get coaching advice
+                advice = self._get_coaching_advice(text, confidence)
+                
+                if advice:
+                    self.coaching_count += 1
+                    coach_type = "AI" if self.llm_available and self.llm_failures < self.max_llm_failures else "RULE"
+                    print(f"   🧠 {coach_type} COACHING [{advice['priority'].value}] {advice['category'].value}:")
+                    print(f"      💡 {advice['insight']}")
+                    print(f"      ▶️  {advice['suggested_action']}")
+                    print(f"   {'─' * 50}")
+                else:
+                    print(f"   🤔 No coaching advice available")
+                    
+            except Exception as e:
+                print(f"   ❌ Coaching error: {str(e)[:50]}...")
+    
     def run(self):
         print(f"\n🎯 FINAL INTEGRATED SALES COACH ACTIVE")
         print(f"Audio: {self.chunk_duration}s chunks, {self.audio_threshold} threshold")
@@ -312,6 +486,21 @@ except Exception as e:
         print("Optimized based on component testing results")
         print("Press Ctrl+C to stop\n")
         
+        # Capture, transcription and coaching run concurrently, so a slow
+        # coaching call never delays the next transcription
+        workers = [
+            threading.Thread(target=self._asr_worker, daemon=True),
+            threading.Thread(target=self._coach_worker, daemon=True)
+        ]
+        for worker in workers:
+            worker.start()
+        
+        # Chunk buffers cycle through the queue and back, so the capture
+        # loop does not allocate a new array per chunk
+        chunk_samples = int(self.chunk_duration * self.sample_rate)
+        self.buffer_pool = Float32BufferPool(chunk_samples)
+        
+        self.recorder.start()
         try:
             while self.running:
                 self.chunk_count += 1
@@ -320,61 +509,19 @@ except Exception as e:
                     # Record audio
                     print(f"🎙️  Chunk #{self.chunk_count} ({self.chunk_duration}s)...", end="", flush=True)
                     
-                    audio_data = sd.rec(
-                        int(self.chunk_duration * self.sample_rate), 
-                        samplerate=self.sample_rate, 
-                        channels=1, 
-                        dtype=np.float32
-                    )
-                    sd.wait()
+                    audio_1d = self.recorder.read(chunk_samples, out=self.buffer_pool.acquire())
                     
                     # Analyze audio
-                    audio_1d = audio_data.flatten()
-                    rms = np.sqrt(np.mean(audio_1d**2))
+                    rms = math.sqrt(float(np.dot(audio_1d, audio_1d)) / audio_1d.size)
                     
                     print(f" RMS:{rms:.4f}")
                     
-                    if rms > self.audio_threshold:
+                    if rms > self.audio_threshold and (self.vad is None or self.vad.count_voiced_frames(audio_1d) >= self.min_voiced_frames):
                         print(f"   🔊 Processing audio...")
+                        self._put_latest(self.audio_q, audio_1d)
                         
-                        try:
-                            # Transcribe
-                            result = self.transcriber.transcribe_audio(audio_1d)
-                            
-                            if result and result.text and result.text.strip() and len(result.text.strip()) > 2:
-                                text = result.text.strip()
-                                self.transcription_count += 1
-                                
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                word_count = len(text.split())
-                                
-                                print(f"   📝 [{timestamp}] \"{text}\" ({word_count} words)")
-                                print(f"   🎯 Confidence: {result.confidence:.3f}")
-                                
-                                # Get coaching advice
-                                advice = self._get_coaching_advice(text, result.confidence)
-                                
-                                if advice:
-                                    self.coaching_count += 1
-                                    coach_type = "AI" if self.llm_available and self.llm_failures < self.max_llm_failures else "RULE"
-                                    print(f"   🧠 {coach_type} COACHING [{advice['priority'].value}] {advice['category'].value}:")
-                                    print(f"      💡 {advice['insight']}")
-                                    print(f"      ▶️  {advice['suggested_action']}")
-                                    print(f"   {'─' * 50}")
-                                else:
-                                    print(f"   🤔 No coaching advice available")
-                                
-                                # Memory cleanup
-                                if self.transcription_count % 5 == 0:
-                                    gc.collect()
-                                    
-                            else:
-                                print(f"   🔇 Transcription unclear or too short")
-                                
-                        except Exception as e:
-                            print(f"   ❌ Processing error: {str(e)[:50]}...")
-                            
                     else:
+                        self.buffer_pool.release(audio_1d)
                         if self.chunk_count % 10 == 0:  # Status every 10 quiet chunks
                             elapsed = (datetime.now() - self.session_start).total_seconds()
                             print(f"   📊 Status: {self.transcription_count} transcriptions, {self.coaching_count} coaching ({elapsed:.0f}s)")
@@ -387,8 +534,24 @@ except Exception as e:
                     print(f"\n❌ Chunk #{self.chunk_count} error: {str(e)[:50]}...")
                     time.sleep(1)  # Brief pause on error
                     
+                    # The input stream died (e.g. the device was unplugged); reopen it
+                    if self.running and not self.recorder.active:
+                        try:
+                            self.recorder.stop()
+                            self.recorder.start()
+                        except Exception as e:
+                            print(f"❌ Could not reopen audio input: {e}")
+                    
         except KeyboardInterrupt:
             pass
+        finally:
+            self.recorder.stop()
+            
+            # Let the workers finish what is already queued
+            self.audio_q.put(None)
+            for worker in workers:
+                worker.join(timeout=30)
+            self._stop_llm_worker()
             
         # Session summary
         elapsed = (datetime.now() - self.session_start).total_seconds()
@@ -396,6 +559,8 @@ except Exception as e:
         print(f"   Session duration: {elapsed:.0f} seconds")
         print(f"   Audio chunks: {self.chunk_count}")  
         print(f"   Transcriptions: {self.transcription_count}")
+        if self.dropped_chunks:
+            print(f"   Chunks dropped (transcription behind): {self.dropped_chunks}")
         print(f"   Coaching responses: {self.coaching_count}")
         print(f"   Transcription rate: {(self.transcription_count/max(1,self.chunk_count)*100):.1f}%")
         print(f"   Coaching success rate: {(self.coaching_count/max(1,self.transcription_count)*100):.1f}%")
@@ -13,6 +13,7 @@ The system will:
 """
 
 import sounddevice as sd
+import math
 import numpy as np
 import time
 import sys
@@ -22,7 +23,9 @@ from datetime import datetime
 
 sys.path.insert(0, '.')
 from sales_coach.src.models.config import load_config
+from sales_coach.src.audio.capture import RingBufferRecorder
 from sales_coach.src.audio.transcription import WhisperTranscriber
+from sales_coach.src.audio.vad import SileroVAD
 from sales_coach.src.llm.coaching import create_coaching_system
 from sales_coach.src.models.conversation import ConversationTurn, Speaker
 
@@ -54,6 +57,16 @@ class ProductionSalesCoach:
             sys.exit(1)
         print("   ✅ Speech-to-text ready")
         
+        # Speech gate in front of Whisper: Silero VAD over 32 ms frames, so
+        # room noise that passes the level check is not transcribed
+        self.vad = SileroVAD(self.config.audio)
+        if self.vad.load_model():
+            print("   ✅ Voice activity detection ready")
+        else:
+            print("   ⚠️  Silero VAD unavailable, using the level check only")
+            self.vad = None
+        self.min_voiced_frames = 5
+        
         # Coaching
         self.coaching_system = create_coaching_system(self.config.models, self.config.coaching)
         if not self.coaching_system:
@@ -64,6 +77,8 @@ class ProductionSalesCoach:
         # Audio settings
         self.sample_rate = 16000
         self.chunk_duration = 4  # Process every 4 seconds
+        # One long-lived input stream; chunks are read back to back from its ring
+        self.recorder = RingBufferRecorder(self.sample_rate)
         
         print("\n🎤 Audio system ready")
         self._show_audio_devices()
@@ -96,26 +111,23 @@ class ProductionSalesCoach:
         chunk_count = 0
         successful_transcriptions = 0
         
+        # Chunks are processed one at a time, so one buffer is reused for all
+        audio_buf = np.empty(int(self.chunk_duration * self.sample_rate), dtype=np.float32)
+        
+        self.recorder.start()
         try:
             while self.running:
                 chunk_count += 1
                 
                 # Record audio chunk
                 try:
-                    audio_data = sd.rec(
-                        int(self.chunk_duration * self.sample_rate), 
-                        samplerate=self.sample_rate, 
-                        channels=1, 
-                        dtype=np.float32
-                    )
-                    sd.wait()
+                    audio_1d = self.recorder.read(len(audio_buf), out=audio_buf)
                     
                     # Check audio level
-                    audio_1d = audio_data.flatten()
-                    rms = np.sqrt(np.mean(audio_1d**2))
+                    rms = math.sqrt(float(np.dot(audio_1d, audio_1d)) / audio_1d.size)
                     
-                    # Only process if there's meaningful audio
-                    if rms > 0.005:  # Threshold for speech
+                    # Only process if there's meaningful audio that contains speech
+                    if rms > 0.005 and (self.vad is None or self.vad.count_voiced_frames(audio_1d) >= self.min_voiced_frames):
                         print(f"🔊 Processing audio #{chunk_count} (level: {rms:.4f})")
                         
                         # Transcribe
@@ -162,9 +174,20 @@ class ProductionSalesCoach:
                 
                 except Exception as e:
                     print(f"❌ Error in chunk #{chunk_count}: {e}")
+                    time.sleep(1)  # Brief pause on error
+                    
+                    # The input stream died (e.g. the device was unplugged); reopen it
+                    if self.running and not self.recorder.active:
+                        try:
+                            self.recorder.stop()
+                            self.recorder.start()
+                        except Exception as e:
+                            print(f"❌ Could not reopen audio input: {e}")
                     
         except KeyboardInterrupt:
             pass  # Handled by signal handler
+        finally:
+            self.recorder.stop()
             
         print(f"\n📈 SESSION SUMMARY:")
         print(f"   Audio chunks processed: {chunk_count}")  
@@ -28,7 +28,10 @@ logger = logging.getLogger(__name__)
 class SalesCoach:
     """Main sales coach system that orchestrates all components."""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None, session_id: Optional[str] = None):
+        # Session identity, shared with the coaching system's conversation state
+        self.session_id = session_id or f"session_{int(time.time())}"
+        
         # Load configuration
         self.config = load_config(config_path)
         self.config.create_directories()
@@ -52,6 +55,12 @@ class SalesCoach:
         self.recent_turns: List[ConversationTurn] = []
         self.recent_coaching: List[CoachingResponse] = []
         self.current_advice: Optional[CoachingResponse] = None
+        self.partial_transcript = ""  # speech still in progress
+        
+        # Turns waiting to be sent to the coaching system as one batch
+        self._turn_buffer: List[ConversationTurn] = []
+        self._turn_buffer_lock = threading.Lock()
+        self._debounce_timer: Optional[threading.Timer] = None
         
         # Statistics
         self.stats = {
@@ -110,12 +119,15 @@ class SalesCoach:
                 raise Exception("Failed to initialize transcription system")
             
             self.transcription_system.set_turn_callback(self._handle_conversation_turn)
+            if self.config.models.whisper_partial_results:
+                self.transcription_system.set_partial_callback(self._handle_partial_transcript)
             
             # Initialize coaching system
             self.console.print("• Loading AI coaching system...")
             self.coaching_system = create_coaching_system(
                 self.config.models, 
-                self.config.coaching
+                self.config.coaching,
+                session_id=self.session_id
             )
             if not self.coaching_system:
                 raise Exception("Failed to initialize coaching system")
@@ -148,9 +160,20 @@ class SalesCoach:
             # Send to transcription system
             if self.transcription_system:
                 self.transcription_system.process_voice_segments(voice_segments, speaker_segments)
+        
+        # Live partial transcript of speech that has not ended yet
+        if self.transcription_system and self.config.models.whisper_partial_results:
+            current_speech = self.vad_system.get_current_speech()
+            if current_speech:
+                self.transcription_system.process_partial_speech(*current_speech)
+    
+    def _handle_partial_transcript(self, result) -> None:
+        """Handle a partial transcript of speech still in progress."""
+        self.partial_transcript = result.text.strip()
     
     def _handle_conversation_turn(self, turn: ConversationTurn) -> None:
         """Handle new conversation turn."""
+        self.partial_transcript = ""
         self.recent_turns.append(turn)
         if len(self.recent_turns) > 20:  # Keep only recent turns
             self.recent_turns = self.recent_turns[-20:]
@@ -159,10 +182,48 @@ class SalesCoach:
         
         # Send to coaching system
         if self.coaching_system:
-            self.coaching_system.add_conversation_turn(turn)
+            self._buffer_coaching_turn(turn)
         
         logger.info(f"New turn: {turn.speaker.value}: {turn.text[:50]}...")
     
+    def _buffer_coaching_turn(self, turn: ConversationTurn) -> None:
+        """Buffer a turn so turns arriving close together reach the LLM as one batch."""
+        # The rep taking over from the customer is the moment advice matters
+        # most, so don't hold that turn back
+        previous = self.recent_turns[-2] if len(self.recent_turns) > 1 else None
+        flush_now = (
+            self.config.coaching.turn_debounce_window <= 0
+            or (turn.speaker == Speaker.SALES_REP
+                and previous is not None and previous.speaker == Speaker.CUSTOMER)
+        )
+        
+        with self._turn_buffer_lock:
+            self._turn_buffer.append(turn)
+            
+            if self._debounce_timer:
+                self._debounce_timer.cancel()
+                self._debounce_timer = None
+            
+            if not flush_now:
+                self._debounce_timer = threading.Timer(
+                    self.config.coaching.turn_debounce_window,
+                    self._flush_turn_buffer
+                )
+                self._debounce_timer.daemon = True
+                self._debounce_timer.start()
+        
+        if flush_now:
+            self._flush_turn_buffer()
+    
+    def _flush_turn_buffer(self) -> None:
+        """Send all buffered turns to the coaching system in arrival order."""
+        with self._turn_buffer_lock:
+            batch, self._turn_buffer = self._turn_buffer, []
+            self._debounce_timer = None
+            
+            if batch and self.coaching_system:
+                self.coaching_system.add_conversation_turns(batch)
+    
     def _handle_coaching_response(self, coaching: CoachingResponse) -> None:
         """Handle coaching response."""
         self.recent_coaching.append(coaching)
@@ -197,6 +258,10 @@ class SalesCoach:
             if self.transcription_system:
                 self.transcription_system.start()
             
+            # Start background diarization
+            if self.diarization_system:
+                self.diarization_system.start_real_time_processing()
+            
             # Start coaching analysis
             if self.coaching_system:
                 self.coaching_system.start_analysis()
@@ -224,11 +289,20 @@ class SalesCoach:
             if self.audio_capture:
                 self.audio_capture.stop_capture()
             
+            # Stop diarization
+            if self.diarization_system:
+                self.diarization_system.stop_real_time_processing()
+            
             # Stop transcription
             if self.transcription_system:
                 self.transcription_system.stop()
             
-            # Stop coaching analysis
+            # Stop coaching analysis, handing over any turns still buffered
+            with self._turn_buffer_lock:
+                if self._debounce_timer:
+                    self._debounce_timer.cancel()
+            self._flush_turn_buffer()
+            
             if self.coaching_system:
                 self.coaching_system.stop_analysis()
             
@@ -269,8 +343,10 @@ class SalesCoach:
         conversation_text = ""
         for turn in self.recent_turns[-5:]:  # Show last 5 turns
             speaker_color = "blue" if turn.speaker == Speaker.SALES_REP else "cyan"
-            timestamp = turn.timestamp.strftime("%H:%M:%S")
-            conversation_text += f"[dim]{timestamp}[/dim] [{speaker_color}]{turn.speaker.value}[/{speaker_color}]: {turn.text}\n\n"
+            conversation_text += f"[dim]{turn.time_label}[/dim] [{speaker_color}]{turn.speaker.value}[/{speaker_color}]: {turn.text}\n\n"
+        
+        if self.partial_transcript:
+            conversation_text += f"[dim italic]… {self.partial_transcript}[/dim italic]\n"
         
         if not conversation_text:
             conversation_text = "[dim]Waiting for conversation...[/dim]"
@@ -396,6 +472,7 @@ class SalesCoach:
         return AudioTestUtility.test_device(device.index, duration=3.0)
 
 
-def create_coach(config_path: Optional[Path] = None) -> SalesCoach:
+def create_coach(config_path: Optional[Path] = None,
+                 session_id: Optional[str] = None) -> SalesCoach:
     """Factory function to create sales coach."""
-    return SalesCoach(config_path)
\ No newline at end of file
+    return SalesCoach(config_path, session_id)
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""Reusable float32 audio buffers for the real-time pipeline."""
+
+import numpy as np
+import queue
+from typing import Optional, Sequence
+
+
+class Float32BufferPool:
+    """
+    Pool of preallocated float32 buffers of a fixed size.
+    
+    Hot paths that need a scratch copy of an utterance acquire a buffer,
+    fill a prefix of it and release it when done, instead of allocating a
+    new array per utterance. Requests larger than the buffer size get a
+    plain allocation that is never pooled.
+    """
+    
+    def __init__(self, buffer_size: int, max_buffers: int = 8):
+        self.buffer_size = buffer_size
+        self._free: queue.Queue = queue.Queue(maxsize=max_buffers)
+    
+    def acquire(self, min_size: int = 0) -> np.ndarray:
+        """Get a buffer holding at least min_size samples."""
+        if min_size > self.buffer_size:
+            return np.empty(min_size, dtype=np.float32)
+        
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return np.empty(self.buffer_size, dtype=np.float32)
+    
+    def release(self, buffer: Optional[np.ndarray]) -> None:
+        """Return a buffer obtained from acquire() to the pool."""
+        if buffer is None or len(buffer) != self.buffer_size:
+            return
+        
+        try:
+            self._free.put_nowait(buffer)
+        except queue.Full:
+            pass  # Pool is full, let this one be garbage collected
+    
+    def copy_in(self, audio_data: np.ndarray) -> np.ndarray:
+        """Copy audio into a pooled buffer and return the buffer."""
+        n = len(audio_data)
+        buffer = self.acquire(n)
+        np.copyto(buffer[:n], audio_data, casting='unsafe')
+        return buffer
+
+
+class SizeClassBufferPool:
+    """
+    Float32 buffers pooled in a few size classes.
+    
+    Each request is served from the smallest class that fits, so a short
+    utterance ties up a short buffer rather than one sized for the longest
+    possible clip. Requests larger than every class get a plain allocation.
+    """
+    
+    def __init__(self, class_sizes: Sequence[int], max_buffers: int = 8):
+        self.pools = [Float32BufferPool(size, max_buffers) for size in sorted(class_sizes)]
+    
+    def acquire(self, min_size: int = 0) -> np.ndarray:
+        """Get a buffer holding at least min_size samples."""
+        for pool in self.pools:
+            if min_size <= pool.buffer_size:
+                return pool.acquire(min_size)
+        return np.empty(min_size, dtype=np.float32)
+    
+    def release(self, buffer: Optional[np.ndarray]) -> None:
+        """Return a buffer obtained from acquire() to its size class."""
+        if buffer is None:
+            return
+        
+        for pool in self.pools:
+            if len(buffer) == pool.buffer_size:
+                pool.release(buffer)
+                return
+    
+    def copy_in(self, audio_data: np.ndarray) -> np.ndarray:
+        """Copy audio into a buffer of the smallest fitting class and return it."""
+        n = len(audio_data)
+        buffer = self.acquire(n)
+        np.copyto(buffer[:n], audio_data, casting='unsafe')
+        return buffer
@@ -16,6 +16,10 @@ from ..models.config import AudioConfig
 logger = logging.getLogger(__name__)
 
 
+# Scale for converting captured int16 PCM to float32 in [-1, 1]
+INT16_SCALE = 1.0 / 32768.0
+
+
 @dataclass
 class AudioDevice:
     """Audio device information."""
@@ -145,6 +149,109 @@ class AudioBuffer:
                     break
 
 
+class RingBufferRecorder:
+    """
+    Long-lived input stream that records into a preallocated ring buffer.
+    
+    Replaces per-chunk sd.rec()/sd.wait(), which opens a new PortAudio stream
+    for every chunk and loses the audio captured while the previous chunk was
+    being processed. Chunks read from the ring are contiguous.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, buffer_seconds: float = 30.0,
+                 blocksize: int = 1600, device: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.device = device
+        self.ring = np.zeros(int(sample_rate * buffer_seconds), dtype=np.float32)
+        self.stream: Optional[sd.InputStream] = None
+        
+        # Absolute sample positions: written by the callback, read by read()
+        self.write_pos = 0
+        self.read_pos = 0
+        self.dropped_samples = 0
+    
+    def _callback(self, indata: np.ndarray, frames: int, time_info: Any, status: Any) -> None:
+        """Copy one block into the ring, wrapping at the end."""
+        start = self.write_pos % len(self.ring)
+        first = min(frames, len(self.ring) - start)
+        self.ring[start:start + first] = indata[:first, 0]
+        if first < frames:
+            self.ring[:frames - first] = indata[first:, 0]
+        self.write_pos += frames
+    
+    def start(self) -> None:
+        """Open the input stream; reading starts from this point."""
+        self.write_pos = self.read_pos = 0
+        self.stream = sd.InputStream(
+            device=self.device,
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='float32',
+            blocksize=self.blocksize,
+            latency='low',
+            callback=self._callback
+        )
+        self.stream.start()
+    
+    def stop(self) -> None:
+        """Close the input stream."""
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+    
+    @property
+    def active(self) -> bool:
+        """Whether the input stream is open and delivering audio."""
+        return self.stream is not None and self.stream.active
+    
+    def read(self, num_samples: int, out: Optional[np.ndarray] = None,
+             timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Block until the next num_samples samples are recorded and return them.
+        
+        If out (of length num_samples) is given, the samples are copied into
+        it so callers can reuse buffers instead of allocating per chunk.
+        
+        Raises:
+            RuntimeError: If the input stream is not running (never started,
+                stopped, or aborted by a device error)
+            TimeoutError: If the samples have not arrived within timeout
+                seconds (default: their duration plus two seconds)
+        """
+        if timeout is None:
+            timeout = num_samples / self.sample_rate + 2.0
+        deadline = time.monotonic() + timeout
+        
+        while self.write_pos - self.read_pos < num_samples:
+            if not self.active:
+                raise RuntimeError("Audio input stream is not running")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No audio from input stream for {timeout:.1f}s")
+            # Short sleeps, so a dead stream is noticed promptly
+            wait = (num_samples - (self.write_pos - self.read_pos)) / self.sample_rate
+            time.sleep(min(wait, remaining, 0.1))
+        
+        # If processing fell more than a ring behind, skip the overwritten audio
+        behind = self.write_pos - self.read_pos - len(self.ring)
+        if behind > 0:
+            self.dropped_samples += behind
+            self.read_pos += behind
+            logger.warning(f"Recorder fell behind, dropped {behind / self.sample_rate:.1f}s of audio")
+        
+        if out is None:
+            out = np.empty(num_samples, dtype=np.float32)
+        
+        start = self.read_pos % len(self.ring)
+        first = min(num_samples, len(self.ring) - start)
+        out[:first] = self.ring[start:start + first]
+        out[first:] = self.ring[:num_samples - first]
+        self.read_pos += num_samples
+        return out
+
+
 class AudioCaptureSystem:
     """Main audio capture system with device management and fallbacks."""
     
@@ -156,7 +263,7 @@ class AudioCaptureSystem:
         # State
         self.is_capturing = False
         self.current_device: Optional[AudioDevice] = None
-        self.stream: Optional[sd.InputStream] = None
+        self.stream: Optional[sd.RawInputStream] = None
         
         # Callbacks
         self.audio_callback: Optional[Callable[[np.ndarray], None]] = None
@@ -199,14 +306,15 @@ class AudioCaptureSystem:
         logger.error("No suitable audio capture device found")
         return None
     
-    def _audio_stream_callback(self, indata: np.ndarray, frames: int, 
+    def _audio_stream_callback(self, indata: Any, frames: int, 
                               time_info: Any, status: sd.CallbackFlags) -> None:
-        """Callback for audio stream."""
+        """Callback for audio stream, called on the PortAudio thread."""
         if status:
             logger.warning(f"Audio stream status: {status}")
         
-        # Add to buffer
-        self.audio_buffer.put(indata[:, 0] if indata.ndim > 1 else indata)
+        # indata is the raw PortAudio buffer (mono int16); view it in place
+        # rather than having sounddevice build an ndarray for every block
+        self.audio_buffer.put(np.frombuffer(indata, dtype=np.int16, count=frames))
         
         # Update statistics
         self.chunks_processed += 1
@@ -221,6 +329,11 @@ class AudioCaptureSystem:
             audio_chunk = self.audio_buffer.get(timeout=0.1)
             
             if audio_chunk is not None:
+                # Audio is buffered as int16 to halve the bytes moved through
+                # the buffer; consumers expect float32 in [-1, 1]
+                audio_chunk = audio_chunk.astype(np.float32)
+                audio_chunk *= INT16_SCALE
+                
                 # Update duration
                 chunk_duration = len(audio_chunk) / self.config.sample_rate
                 self.total_duration += chunk_duration
@@ -247,13 +360,13 @@ class AudioCaptureSystem:
         
         try:
             # Create audio stream
-            self.stream = sd.InputStream(
+            self.stream = sd.RawInputStream(
                 device=self.current_device.index,
                 channels=1,  # Mono for simplicity
                 samplerate=self.config.sample_rate,
                 blocksize=int(self.config.sample_rate * self.config.chunk_duration / 10),
                 callback=self._audio_stream_callback,
-                dtype=np.float32
+                dtype='int16'
             )
             
             # Start stream
@@ -336,8 +449,14 @@ class AudioTestUtility:
     
     @staticmethod
     def test_device(device_index: int, duration: float = 5.0, 
-                   sample_rate: int = 16000) -> Dict[str, Any]:
-        """Test a specific audio device."""
+                   sample_rate: int = 16000,
+                   stop_on_level: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Test a specific audio device.
+        
+        If stop_on_level is set, the test ends early once the peak level has
+        reached it after the first 500ms, since the device is clearly live.
+        """
         results = {
             "success": False,
             "error": None,
@@ -347,16 +466,29 @@ class AudioTestUtility:
         }
         
         try:
-            recording = []
+            # One second of headroom for blocks delivered before the stream closes
+            recording = np.empty(int(duration * sample_rate) + sample_rate, dtype=np.float32)
+            done = threading.Event()
+            min_frames = int(sample_rate * 0.5)
+            state = {"frames": 0, "peak": 0.0}
             
             def callback(indata, frames, time, status):
                 if status:
                     print(f"Status: {status}")
-                recording.append(indata.copy())
+                
+                offset = state["frames"]
+                n = min(frames, len(recording) - offset)
+                recording[offset:offset + n] = indata[:n, 0]
+                state["frames"] += n
                 
                 # Calculate RMS for real-time monitoring
                 rms = np.sqrt(np.mean(indata**2))
                 results["rms_levels"].append(float(rms))
+                
+                if stop_on_level is not None:
+                    state["peak"] = max(state["peak"], float(np.max(np.abs(indata))))
+                    if state["frames"] >= min_frames and state["peak"] >= stop_on_level:
+                        done.set()
             
             with sd.InputStream(
                 device=device_index,
@@ -364,16 +496,19 @@ class AudioTestUtility:
                 samplerate=sample_rate,
                 callback=callback
             ):
-                sd.sleep(int(duration * 1000))
+                done.wait(timeout=duration)
             
-            if recording:
-                audio_data = np.concatenate(recording)
-                results["peak_level"] = float(np.max(np.abs(audio_data)))
+            if state["frames"]:
+                audio_data = recording[:state["frames"]]
+                
+                # Rectify once in place and reuse it for both reductions
+                np.abs(audio_data, out=audio_data)
+                results["peak_level"] = float(audio_data.max())
                 
                 # Calculate silence ratio (samples below threshold)
                 silence_threshold = 0.01
-                silence_samples = np.sum(np.abs(audio_data) < silence_threshold)
-                results["silence_ratio"] = silence_samples / len(audio_data)
+                silence_samples = np.count_nonzero(audio_data < silence_threshold)
+                results["silence_ratio"] = silence_samples / audio_data.size
                 
                 results["success"] = True
             
@@ -391,9 +526,12 @@ class AudioTestUtility:
         best_device = None
         best_score = -1
         
+        # One stream at a time: PortAudio does not support opening streams
+        # concurrently, and devices sharing a physical mic can refuse to
+        # open together. The early stop keeps this quick.
         for device in input_devices:
-            print(f"Testing device: {device.name}")
-            results = AudioTestUtility.test_device(device.index, duration=3.0)
+            results = AudioTestUtility.test_device(device.index, duration=3.0, stop_on_level=0.2)
+            print(f"Tested device: {device.name}")
             
             if results["success"]:
                 # Score based on peak level and low silence ratio
@@ -1,25 +1,26 @@
 """Speaker diarization system using pyannote.audio."""
 
-import torch
 import numpy as np
 import logging
+import contextlib
+import importlib.util
+from collections import defaultdict
 from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 from pathlib import Path
+import sys
 import threading
+import queue
 import time
-import tempfile
-import os
 
-try:
-    from pyannote.audio import Pipeline
-    from pyannote.core import Annotation, Segment
-    PYANNOTE_AVAILABLE = True
-except ImportError:
-    PYANNOTE_AVAILABLE = False
-    Pipeline = None
-    Annotation = None
-    Segment = None
+# torch and pyannote.audio take seconds to import and are only needed once
+# the pipeline is loaded, so they are imported on first use
+PYANNOTE_AVAILABLE = importlib.util.find_spec("pyannote") is not None and \
+    importlib.util.find_spec("pyannote.audio") is not None
+
+# Numba (pulled in by librosa/whisper) speeds up the fallback detector,
+# which is the hot path on devices that cannot run pyannote
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
 
 from ..models.config import ModelConfig
 from ..models.conversation import Speaker, SpeakerProfile
@@ -28,6 +29,46 @@ from .vad import VoiceSegment
 
 logger = logging.getLogger(__name__)
 
+_chunk_rms_kernel = None
+
+
+def _compile_chunk_rms_kernel():
+    """JIT-compile the per-chunk RMS kernel on first use."""
+    global _chunk_rms_kernel
+    if _chunk_rms_kernel is None:
+        from numba import njit, prange
+        
+        @njit(parallel=True, fastmath=True, cache=True)
+        def chunk_rms(audio, chunk_size):
+            n_chunks = len(audio) // chunk_size
+            out = np.empty(n_chunks)
+            for i in prange(n_chunks):
+                base = i * chunk_size
+                total = 0.0
+                for j in range(chunk_size):
+                    v = audio[base + j]
+                    total += v * v
+                out[i] = np.sqrt(total / chunk_size)
+            return out
+        
+        _chunk_rms_kernel = chunk_rms
+    return _chunk_rms_kernel
+
+
+def _chunk_rms(audio_data: np.ndarray, chunk_size: int) -> np.ndarray:
+    """RMS of each full chunk_size-sample chunk of audio_data."""
+    n_full = len(audio_data) // chunk_size
+    if NUMBA_AVAILABLE:
+        try:
+            kernel = _compile_chunk_rms_kernel()
+            return kernel(np.ascontiguousarray(audio_data, dtype=np.float32), chunk_size)
+        except Exception as e:
+            logger.debug(f"Numba RMS kernel unavailable, using NumPy: {e}")
+    
+    # One reduction over a (chunks, samples) view
+    chunks = audio_data[:n_full * chunk_size].reshape(n_full, chunk_size)
+    return np.sqrt(np.einsum('ij,ij->i', chunks, chunks) / chunk_size)
+
 
 @dataclass
 class SpeakerSegment:
@@ -37,28 +78,174 @@ class SpeakerSegment:
     speaker_id: str
     confidence: float
     audio_data: Optional[np.ndarray] = None
+    embedding: Optional[np.ndarray] = None  # speaker embedding from the pipeline
     
     @property
     def duration(self) -> float:
         return self.end_time - self.start_time
 
 
+class SpeakerSegmentArray:
+    """
+    Speaker segments stored column-wise in NumPy arrays.
+    
+    Speaker IDs are interned to small integer codes, so scans over a whole
+    session's segments (overlap queries, per-speaker totals) run as array
+    operations instead of walking SpeakerSegment objects. Indexing and
+    iteration still hand out SpeakerSegment instances.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        self._starts = np.empty(capacity, dtype=np.float64)
+        self._ends = np.empty(capacity, dtype=np.float64)
+        self._confidences = np.empty(capacity, dtype=np.float32)
+        self._speaker_codes = np.empty(capacity, dtype=np.int16)
+        self._size = 0
+        
+        # Interned speaker IDs: code -> label and label -> code
+        self.speaker_labels: List[str] = []
+        self._speaker_vocab: Dict[str, int] = {}
+    
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts[:self._size]
+    
+    @property
+    def ends(self) -> np.ndarray:
+        return self._ends[:self._size]
+    
+    @property
+    def confidences(self) -> np.ndarray:
+        return self._confidences[:self._size]
+    
+    @property
+    def speaker_codes(self) -> np.ndarray:
+        return self._speaker_codes[:self._size]
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, index: int) -> SpeakerSegment:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("speaker segment index out of range")
+        
+        return SpeakerSegment(
+            start_time=float(self._starts[index]),
+            end_time=float(self._ends[index]),
+            speaker_id=self.speaker_labels[self._speaker_codes[index]],
+            confidence=float(self._confidences[index])
+        )
+    
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+    
+    def speaker_code(self, speaker_id: str) -> int:
+        """Get the interned code for a speaker ID, adding it if new."""
+        code = self._speaker_vocab.get(speaker_id)
+        if code is None:
+            code = len(self.speaker_labels)
+            self._speaker_vocab[speaker_id] = code
+            self.speaker_labels.append(speaker_id)
+        return code
+    
+    def extend(self, segments: List[SpeakerSegment]) -> None:
+        """Append segments."""
+        n = len(segments)
+        if not n:
+            return
+        
+        self._reserve(self._size + n)
+        block = slice(self._size, self._size + n)
+        self._starts[block] = [segment.start_time for segment in segments]
+        self._ends[block] = [segment.end_time for segment in segments]
+        self._confidences[block] = [segment.confidence for segment in segments]
+        self._speaker_codes[block] = [self.speaker_code(segment.speaker_id) for segment in segments]
+        self._size += n
+    
+    def _reserve(self, size: int) -> None:
+        """Grow the columns to hold at least size segments."""
+        if size <= len(self._starts):
+            return
+        
+        capacity = max(size, 2 * len(self._starts))
+        for name in ("_starts", "_ends", "_confidences", "_speaker_codes"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+    
+    def speaking_times(self) -> Dict[str, float]:
+        """Total duration per speaker ID."""
+        totals = np.bincount(
+            self.speaker_codes,
+            weights=self.ends - self.starts,
+            minlength=len(self.speaker_labels)
+        )
+        return {label: float(total) for label, total in zip(self.speaker_labels, totals)}
+
+
 class SpeakerDiarization:
     """Speaker diarization using pyannote.audio."""
     
     def __init__(self, config: ModelConfig):
         self.config = config
-        self.pipeline: Optional[Pipeline] = None
+        self.pipeline: Optional[Any] = None  # pyannote.audio Pipeline
         self.is_loaded = False
+        # Sales calls are two-party, so the clustering step can be told the
+        # speaker count rather than estimating it
+        self.expected_num_speakers: Optional[int] = config.num_speakers
+        self.use_half_precision = False
         
         # Speaker tracking
         self.known_speakers: Dict[str, SpeakerProfile] = {}
-        self.speaker_segments: List[SpeakerSegment] = []
+        self.speaker_segments = SpeakerSegmentArray()
+        
+        # Start-sorted index over speaker_segments for overlap queries,
+        # rebuilt lazily after speaker_segments changes
+        self._segment_index_dirty = True
+        self._sorted_order = np.empty(0, dtype=np.int64)
+        self._sorted_starts = np.empty(0)
+        self._sorted_ends = np.empty(0)
+        self._sorted_codes = np.empty(0, dtype=np.int16)
+        self._running_max_ends = np.empty(0)
         
         # Real-time processing
-        self.audio_buffer: List[Tuple[np.ndarray, float]] = []  # (audio, timestamp)
+        self.sample_rate = 16000
         self.buffer_duration = 30.0  # seconds
-        self.processing_overlap = 5.0  # seconds
+        self.processing_overlap = 5.0  # seconds of left context per block
+        self.full_refresh_interval = 6  # re-diarize the whole buffer every N blocks
+        self.chunks_per_block = 10  # diarize after this many new chunks...
+        self.min_block_interval = 2.0  # ...and no more often than this (seconds)
+        self.embedding_match_threshold = 0.75  # cosine similarity to reuse a known speaker
+        self.embedding_momentum = 0.9  # weight of the cached centroid per update
+        
+        # Audio buffer for real-time diarization. It is twice the buffer
+        # duration so the newest audio is always one contiguous slice that
+        # can be handed to pyannote without copying; samples are only moved
+        # back to the start when the write position reaches the end.
+        self._ring_capacity = int(self.buffer_duration * self.sample_rate)
+        self._ring = np.empty(2 * self._ring_capacity, dtype=np.float32)
+        self._ring_end = 0  # write position
+        self._ring_valid = 0  # buffered samples ending at the write position
+        self._ring_end_time = 0.0  # timestamp of the end of the buffered audio
+        self._chunks_since_block = 0
+        self._last_block_time = 0.0  # time.monotonic() of the last block
+        
+        # Incremental processing state
+        self._last_processed_end: Optional[float] = None
+        self._blocks_processed = 0
+        self._next_speaker_index = 0
+        
+        # Background diarization so the audio thread never waits on pyannote.
+        # Blocks are copied out of the ring buffer before being queued.
+        self.diarization_queue: queue.Queue = queue.Queue(maxsize=2)
+        self.is_running = False
+        self.worker_thread: Optional[threading.Thread] = None
+        self._segments_lock = threading.Lock()
+        self._completed_segments: List[SpeakerSegment] = []
         
         logger.info("Initializing speaker diarization system")
     
@@ -69,6 +256,9 @@ class SpeakerDiarization:
             return False
         
         try:
+            import torch
+            from pyannote.audio import Pipeline
+            
             # Load the diarization pipeline
             # You'll need to authenticate with HuggingFace for some models
             self.pipeline = Pipeline.from_pretrained(
@@ -79,9 +269,24 @@ class SpeakerDiarization:
             # Set device
             if torch.cuda.is_available():
                 self.pipeline = self.pipeline.to(torch.device("cuda"))
+                # Segmentation runs on fixed-size windows, so let cuDNN pick
+                # the fastest kernels for that shape once
+                torch.backends.cudnn.benchmark = True
+                # Segmentation and embedding are memory-bound; fp16 halves the traffic
+                self.use_half_precision = self.config.diarization_fp16
             elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
                 self.pipeline = self.pipeline.to(torch.device("mps"))
             
+            # Every speaker in every sliding segmentation window gets its own
+            # embedding pass, so a larger step means proportionally fewer passes,
+            # at the cost of less overlap to aggregate (lower accuracy)
+            segmentation = getattr(self.pipeline, "_segmentation", None)
+            if segmentation is not None and hasattr(segmentation, "duration"):
+                segmentation.step = self.config.diarization_segmentation_step * segmentation.duration
+            
+            if self.config.diarization_compile and torch.cuda.is_available():
+                self._compile_submodules()
+            
             self.is_loaded = True
             logger.info("Pyannote speaker diarization pipeline loaded successfully")
             return True
@@ -91,13 +296,54 @@ class SpeakerDiarization:
             logger.info("Falling back to simple speaker detection")
             return False
     
-    def diarize_audio(self, audio_data: np.ndarray, sample_rate: int = 16000) -> List[SpeakerSegment]:
+    def _compile_submodules(self) -> None:
+        """
+        torch.compile the segmentation and embedding models.
+        
+        Compilation happens lazily, so the pipeline is run once on a short
+        dummy waveform to build the graphs before the first real call. If
+        that fails the original modules are restored.
+        """
+        import torch
+        
+        targets = []
+        segmentation = getattr(self.pipeline, "_segmentation", None)
+        if segmentation is not None and hasattr(segmentation, "model"):
+            targets.append((segmentation, "model"))
+        embedding = getattr(self.pipeline, "_embedding", None)
+        if embedding is not None and hasattr(embedding, "model_"):
+            targets.append((embedding, "model_"))
+        
+        if not targets:
+            return
+        
+        originals = [(owner, attr, getattr(owner, attr)) for owner, attr in targets]
+        try:
+            for owner, attr, module in originals:
+                setattr(owner, attr, torch.compile(module, mode="reduce-overhead", fullgraph=False))
+            
+            # Low-level noise rather than silence so the embedding step runs too
+            warmup = torch.randn(1, 10 * self.sample_rate) * 0.01
+            with torch.inference_mode(), self._precision_context():
+                self.pipeline({"waveform": warmup, "sample_rate": self.sample_rate})
+            
+            logger.info("Compiled diarization segmentation/embedding models")
+            
+        except Exception as e:
+            logger.warning(f"torch.compile failed for diarization, running eagerly: {e}")
+            for owner, attr, module in originals:
+                setattr(owner, attr, module)
+    
+    def diarize_audio(self, audio_data: np.ndarray, sample_rate: int = 16000,
+                      real_time: bool = False) -> List[SpeakerSegment]:
         """
         Perform speaker diarization on audio data.
         
         Args:
             audio_data: Audio waveform
             sample_rate: Sample rate of the audio
+            real_time: Whether this is a live block, which may not contain
+                every speaker yet
             
         Returns:
             List of speaker segments
@@ -106,74 +352,96 @@ class SpeakerDiarization:
             return self._fallback_diarization(audio_data, sample_rate)
         
         try:
-            # Save audio to temporary file (pyannote expects file input)
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_path = temp_file.name
+            import torch
             
-            # Write audio file
-            import soundfile as sf
-            sf.write(temp_path, audio_data, sample_rate)
+            # Hand pyannote the waveform in memory as a (channel, time) tensor
+            # instead of round-tripping through a temporary WAV file
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+            waveform = torch.from_numpy(audio_data).unsqueeze(0)
             
-            try:
-                # Run diarization
-                diarization = self.pipeline(temp_path)
-                
-                segments = []
-                for turn, _, speaker in diarization.itertracks(yield_label=True):
-                    segment = SpeakerSegment(
-                        start_time=turn.start,
-                        end_time=turn.end,
-                        speaker_id=speaker,
-                        confidence=1.0,  # pyannote doesn't provide confidence scores
-                        audio_data=None  # We don't store audio data in segments
-                    )
-                    segments.append(segment)
-                
-                logger.debug(f"Diarized audio into {len(segments)} segments")
-                return segments
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            # Run diarization without autograd bookkeeping
+            with torch.inference_mode(), self._precision_context():
+                diarization, embeddings = self.pipeline(
+                    {"waveform": waveform, "sample_rate": sample_rate},
+                    return_embeddings=True,
+                    **self._speaker_count_hints(real_time)
+                )
+            
+            # One embedding per speaker label, reused by every segment of that
+            # speaker; speakers pyannote could not embed come back as NaN
+            speaker_embeddings = {}
+            if embeddings is not None:
+                for speaker, embedding in zip(diarization.labels(), embeddings):
+                    if np.all(np.isfinite(embedding)):
+                        speaker_embeddings[speaker] = np.asarray(embedding, dtype=np.float32)
+            
+            segments = []
+            for turn, _, speaker in diarization.itertracks(yield_label=True):
+                # Labels repeat across every segment and dict lookup, so
+                # share one string object per label
+                speaker = sys.intern(speaker)
+                segment = SpeakerSegment(
+                    start_time=turn.start,
+                    end_time=turn.end,
+                    speaker_id=speaker,
+                    confidence=1.0,  # pyannote doesn't provide confidence scores
+                    audio_data=None,  # We don't store audio data in segments
+                    embedding=speaker_embeddings.get(speaker)
+                )
+                segments.append(segment)
+            
+            logger.debug(f"Diarized audio into {len(segments)} segments")
+            return segments
                     
         except Exception as e:
             logger.error(f"Error in pyannote diarization: {e}")
             return self._fallback_diarization(audio_data, sample_rate)
     
+    def _speaker_count_hints(self, real_time: bool) -> Dict[str, int]:
+        """Speaker-count arguments for the pipeline call."""
+        if self.expected_num_speakers is None:
+            return {}
+        if real_time:
+            # Early in a call only the rep may have spoken
+            return {"min_speakers": 1, "max_speakers": self.expected_num_speakers}
+        return {"num_speakers": self.expected_num_speakers}
+    
+    def _precision_context(self):
+        """Autocast context for pipeline inference (fp16 on CUDA when enabled)."""
+        if self.use_half_precision:
+            import torch
+            return torch.autocast("cuda", dtype=torch.float16)
+        return contextlib.nullcontext()
+    
     def _fallback_diarization(self, audio_data: np.ndarray, sample_rate: int) -> List[SpeakerSegment]:
         """Fallback speaker detection when pyannote is not available."""
         # Simple energy-based speaker detection
         # This is a very basic implementation - in practice you'd want more sophisticated methods
         
         chunk_size = sample_rate * 2  # 2-second chunks
-        segments = []
-        
-        for i in range(0, len(audio_data), chunk_size):
-            chunk = audio_data[i:i + chunk_size]
-            start_time = i / sample_rate
-            end_time = min((i + chunk_size) / sample_rate, len(audio_data) / sample_rate)
-            
-            # Simple speaker assignment based on energy characteristics
-            # This is a placeholder - real implementation would use more features
-            rms = np.sqrt(np.mean(chunk**2))
-            
-            # Assign speaker based on energy level (very crude)
-            if rms > 0.02:
-                speaker_id = "SPEAKER_1" if (i // chunk_size) % 2 == 0 else "SPEAKER_2"
-            else:
-                continue  # Skip silent segments
-            
-            segment = SpeakerSegment(
-                start_time=start_time,
-                end_time=end_time,
-                speaker_id=speaker_id,
+        n_samples = len(audio_data)
+        n_full = n_samples // chunk_size
+        total_duration = n_samples / sample_rate
+        
+        # RMS of all full chunks in one pass, plus the trailing partial
+        # chunk if there is one
+        rms = _chunk_rms(audio_data, chunk_size)
+        if n_full * chunk_size < n_samples:
+            tail = audio_data[n_full * chunk_size:]
+            rms = np.append(rms, np.sqrt(np.mean(tail**2)))
+        
+        # Assign speaker based on energy level (very crude), skipping silent chunks
+        # This is a placeholder - real implementation would use more features
+        return [
+            SpeakerSegment(
+                start_time=i * chunk_size / sample_rate,
+                end_time=min((i + 1) * chunk_size / sample_rate, total_duration),
+                speaker_id="SPEAKER_1" if i % 2 == 0 else "SPEAKER_2",
                 confidence=0.5,  # Low confidence for fallback method
                 audio_data=None
             )
-            segments.append(segment)
-        
-        return segments
+            for i in np.flatnonzero(rms > 0.02).tolist()
+        ]
     
     def process_voice_segments(self, voice_segments: List[VoiceSegment]) -> List[SpeakerSegment]:
         """Process voice segments and identify speakers."""
@@ -181,22 +449,28 @@ class SpeakerDiarization:
             return []
         
         # Concatenate voice segments into continuous audio
-        audio_chunks = []
-        timestamps = []
-        
-        for segment in voice_segments:
-            if segment.audio_data is not None:
-                audio_chunks.append(segment.audio_data)
-                timestamps.append((segment.start_time, segment.end_time))
+        timestamps = [
+            (segment.start_time, segment.end_time)
+            for segment in voice_segments if segment.audio_data is not None
+        ]
         
-        if not audio_chunks:
+        if not timestamps:
             return []
         
-        # Combine audio segments
-        combined_audio = np.concatenate(audio_chunks)
+        # Combine audio segments into a single preallocated array
+        total_samples = sum(
+            len(segment.audio_data) for segment in voice_segments if segment.audio_data is not None
+        )
+        combined_audio = np.empty(total_samples, dtype=np.float32)
+        offset = 0
+        for segment in voice_segments:
+            if segment.audio_data is not None:
+                n = len(segment.audio_data)
+                np.copyto(combined_audio[offset:offset + n], segment.audio_data, casting='unsafe')
+                offset += n
         
         # Perform diarization
-        speaker_segments = self.diarize_audio(combined_audio, self.config.sample_rate)
+        speaker_segments = self.diarize_audio(combined_audio, self.sample_rate)
         
         # Map back to original timestamps
         # This is simplified - in practice you'd need more sophisticated mapping
@@ -218,16 +492,21 @@ class SpeakerDiarization:
         - Speaking pattern analysis
         - User feedback/training
         """
-        if not speaker_segments:
+        if not len(speaker_segments):
             return {}
         
+        if isinstance(speaker_segments, SpeakerSegmentArray):
+            return self._roles_from_speaking_times(speaker_segments.speaking_times())
+        
         # Count speaking time for each speaker
-        speaker_times = {}
+        speaker_times: Dict[str, float] = defaultdict(float)
         for segment in speaker_segments:
-            if segment.speaker_id not in speaker_times:
-                speaker_times[segment.speaker_id] = 0.0
             speaker_times[segment.speaker_id] += segment.duration
         
+        return self._roles_from_speaking_times(speaker_times)
+    
+    def _roles_from_speaking_times(self, speaker_times: Dict[str, float]) -> Dict[str, Speaker]:
+        """Map speaker IDs to roles from their total speaking time."""
         # Sort speakers by speaking time
         sorted_speakers = sorted(speaker_times.items(), key=lambda x: x[1], reverse=True)
         
@@ -253,116 +532,393 @@ class SpeakerDiarization:
     
     def create_speaker_profiles(self, speaker_segments: List[SpeakerSegment]) -> None:
         """Create or update speaker profiles based on segments."""
-        role_mapping = self.identify_speaker_roles(speaker_segments)
+        if not speaker_segments:
+            return
         
+        # Aggregate [total duration, segment count] per speaker in one pass
+        speaker_stats: Dict[str, List] = defaultdict(lambda: [0.0, 0])
+        speaker_embeddings: Dict[str, np.ndarray] = {}
         for segment in speaker_segments:
-            speaker_id = segment.speaker_id
-            role = role_mapping.get(speaker_id, Speaker.UNKNOWN)
+            totals = speaker_stats[segment.speaker_id]
+            totals[0] += segment.duration
+            totals[1] += 1
+            if segment.embedding is not None:
+                speaker_embeddings.setdefault(segment.speaker_id, segment.embedding)
+        
+        role_mapping = self._roles_from_speaking_times(
+            {speaker_id: totals[0] for speaker_id, totals in speaker_stats.items()}
+        )
+        
+        for speaker_id, (duration, count) in speaker_stats.items():
+            profile = self.known_speakers.get(speaker_id)
             
-            if speaker_id not in self.known_speakers:
+            if profile is None:
                 # Create new speaker profile
                 profile = SpeakerProfile(
-                    speaker=role,
+                    speaker=role_mapping.get(speaker_id, Speaker.UNKNOWN),
                     voice_characteristics={
                         "speaker_id": speaker_id,
-                        "total_duration": segment.duration
+                        "total_duration": duration
                     },
                     speaking_patterns={
-                        "average_segment_length": segment.duration,
-                        "segments_count": 1
+                        "average_segment_length": duration / count,
+                        "segments_count": count
                     }
                 )
                 self.known_speakers[speaker_id] = profile
+                updates = count - 1
+                
+                if speaker_id in speaker_embeddings:
+                    profile.voice_characteristics["embedding"] = speaker_embeddings[speaker_id].copy()
                 
             else:
                 # Update existing profile
-                profile = self.known_speakers[speaker_id]
-                profile.voice_characteristics["total_duration"] += segment.duration
-                
-                # Update speaking patterns
-                old_count = profile.speaking_patterns["segments_count"]
-                old_avg = profile.speaking_patterns["average_segment_length"]
-                new_avg = (old_avg * old_count + segment.duration) / (old_count + 1)
+                total_duration = profile.voice_characteristics["total_duration"] + duration
+                total_count = profile.speaking_patterns["segments_count"] + count
                 
-                profile.speaking_patterns["average_segment_length"] = new_avg
-                profile.speaking_patterns["segments_count"] = old_count + 1
+                profile.voice_characteristics["total_duration"] = total_duration
+                profile.speaking_patterns["average_segment_length"] = total_duration / total_count
+                profile.speaking_patterns["segments_count"] = total_count
+                updates = count
                 
+                # Keep the cached embedding as a moving-average centroid
+                embedding = speaker_embeddings.get(speaker_id)
+                if embedding is not None:
+                    centroid = profile.voice_characteristics.get("embedding")
+                    if centroid is None:
+                        profile.voice_characteristics["embedding"] = embedding.copy()
+                    else:
+                        centroid *= self.embedding_momentum
+                        centroid += (1.0 - self.embedding_momentum) * embedding
+            
+            for _ in range(updates):
                 profile.update_profile({})  # Update timestamp and confidence
     
+    def _rebuild_segment_index(self) -> None:
+        """Rebuild the start-sorted arrays used by get_speaker_for_segment."""
+        segments = self.speaker_segments
+        self._sorted_order = np.argsort(segments.starts, kind='stable')
+        self._sorted_starts = segments.starts[self._sorted_order]
+        self._sorted_ends = segments.ends[self._sorted_order]
+        self._sorted_codes = segments.speaker_codes[self._sorted_order]
+        
+        # Ends are not sorted, but their running maximum is, which lets us
+        # bisect for the first segment that can still reach start_time
+        self._running_max_ends = np.maximum.accumulate(self._sorted_ends) if len(self._sorted_ends) else self._sorted_ends
+        self._segment_index_dirty = False
+    
+    def _find_overlapping(self, start_time: float, end_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find known speaker segments overlapping a time range.
+        
+        Returns:
+            Tuple of (indices into the sorted segment index, overlap durations)
+        """
+        if self._segment_index_dirty:
+            self._rebuild_segment_index()
+        
+        # Candidate segments start no later than end_time and come after the
+        # first segment whose running max end reaches start_time
+        lo = int(np.searchsorted(self._running_max_ends, start_time, side='left'))
+        hi = int(np.searchsorted(self._sorted_starts, end_time, side='right'))
+        if lo >= hi:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        
+        starts = self._sorted_starts[lo:hi]
+        ends = self._sorted_ends[lo:hi]
+        overlaps = np.minimum(ends, end_time) - np.maximum(starts, start_time)
+        
+        overlapping = np.flatnonzero(ends >= start_time)
+        return lo + overlapping, overlaps[overlapping]
+    
     def get_speaker_for_segment(self, start_time: float, end_time: float) -> Optional[Speaker]:
         """Get the speaker role for a given time segment."""
-        # Find speaker segments that overlap with the given time range
-        overlapping_segments = []
+        with self._segments_lock:
+            # Find overlapping segments
+            indices, overlaps = self._find_overlapping(start_time, end_time)
+            if not len(indices):
+                return None
+            
+            # Find the segment with maximum overlap, earliest added on ties
+            tied = indices[overlaps == overlaps.max()]
+            best = int(tied[np.argmin(self._sorted_order[tied])])
+            speaker_id = self.speaker_segments.speaker_labels[self._sorted_codes[best]]
         
-        for segment in self.speaker_segments:
-            if (segment.start_time <= end_time and segment.end_time >= start_time):
-                overlap_duration = min(segment.end_time, end_time) - max(segment.start_time, start_time)
-                overlapping_segments.append((segment, overlap_duration))
+        # Map speaker ID to role
+        if speaker_id in self.known_speakers:
+            return self.known_speakers[speaker_id].speaker
         
-        if not overlapping_segments:
-            return None
+        return Speaker.UNKNOWN
+    
+    def _append_to_buffer(self, audio_chunk: np.ndarray, timestamp: float) -> None:
+        """Append a chunk to the real-time buffer, keeping the last buffer_duration seconds."""
+        n = len(audio_chunk)
+        if n > self._ring_capacity:
+            audio_chunk = audio_chunk[-self._ring_capacity:]
+            n = self._ring_capacity
+        
+        if self._ring_end + n > len(self._ring):
+            # Move the audio still needed back to the start of the buffer
+            keep = min(self._ring_valid, self._ring_capacity - n)
+            self._ring[:keep] = self._ring[self._ring_end - keep:self._ring_end]
+            self._ring_end = keep
+            self._ring_valid = keep
+        
+        np.copyto(self._ring[self._ring_end:self._ring_end + n], audio_chunk)
+        self._ring_end += n
+        self._ring_valid = min(self._ring_valid + n, self._ring_capacity)
+        self._ring_end_time = timestamp + n / self.sample_rate
+    
+    def start_real_time_processing(self) -> None:
+        """Start the background diarization worker."""
+        if self.is_running:
+            logger.warning("Real-time diarization already running")
+            return
+        
+        self.is_running = True
+        self.worker_thread = threading.Thread(target=self._diarization_worker)
+        self.worker_thread.daemon = True
+        self.worker_thread.start()
+        
+        logger.info("Started real-time diarization processing")
+    
+    def stop_real_time_processing(self) -> None:
+        """Stop the background diarization worker."""
+        if not self.is_running:
+            return
         
-        # Find the segment with maximum overlap
-        best_segment = max(overlapping_segments, key=lambda x: x[1])[0]
+        self.is_running = False
         
-        # Map speaker ID to role
-        if best_segment.speaker_id in self.known_speakers:
-            return self.known_speakers[best_segment.speaker_id].speaker
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=2.0)
         
-        return Speaker.UNKNOWN
+        logger.info("Stopped real-time diarization processing")
     
     def process_real_time(self, audio_chunk: np.ndarray, timestamp: float) -> List[SpeakerSegment]:
-        """Process audio chunk for real-time speaker diarization."""
-        # Add to buffer
-        self.audio_buffer.append((audio_chunk, timestamp))
-        
-        # Remove old audio from buffer
-        buffer_start_time = timestamp - self.buffer_duration
-        self.audio_buffer = [
-            (chunk, ts) for chunk, ts in self.audio_buffer
-            if ts >= buffer_start_time
-        ]
+        """
+        Process audio chunk for real-time speaker diarization.
         
-        # Check if we have enough audio to process
-        if len(self.audio_buffer) < 10:  # Need at least 10 chunks
+        With the background worker running this only queues work and returns
+        the segments the worker has finished since the previous call;
+        otherwise the block is diarized on the calling thread.
+        """
+        # Add to buffer
+        self._append_to_buffer(audio_chunk, timestamp)
+        self._chunks_since_block += 1
+        
+        # Process the buffer once enough new chunks have arrived and the
+        # previous block is not too recent
+        now = time.monotonic()
+        block_due = (
+            self._chunks_since_block >= self.chunks_per_block
+            and now - self._last_block_time >= self.min_block_interval
+        )
+        if block_due:
+            self._chunks_since_block = 0
+            self._last_block_time = now
+        
+        if self.is_running:
+            if block_due:
+                block_audio, base_time = self._next_block()
+                self._queue_block(block_audio.copy(), base_time)
+            return self._take_completed_segments()
+        
+        if not block_due:
             return []
         
-        # Process buffer every few seconds
-        if len(self.audio_buffer) % 10 != 0:  # Process every 10 chunks
-            return []
+        block_audio, base_time = self._next_block()
+        return self._diarize_block(block_audio, base_time)
+    
+    def _next_block(self) -> Tuple[np.ndarray, float]:
+        """
+        Select the buffered audio to diarize next.
         
+        Returns:
+            Tuple of (block audio as a view of the buffer, block start time)
+        """
+        # Diarize the audio that arrived since the last block plus some left
+        # context, rather than the whole buffer every time. Every few blocks
+        # the full buffer is used so labels are re-anchored on more audio.
+        self._blocks_processed += 1
+        last_processed_end = self._last_processed_end
+        full_refresh = (
+            last_processed_end is None
+            or self._blocks_processed % self.full_refresh_interval == 0
+        )
+        
+        block_samples = self._ring_valid
+        if not full_refresh:
+            context_start = last_processed_end - self.processing_overlap
+            block_samples = min(
+                block_samples,
+                int(round((self._ring_end_time - context_start) * self.sample_rate))
+            )
+        
+        # Block audio as a contiguous view of the buffer, no concatenation needed
+        block_audio = self._ring[self._ring_end - block_samples:self._ring_end]
+        base_time = self._ring_end_time - block_samples / self.sample_rate
+        return block_audio, base_time
+    
+    def _queue_block(self, block_audio: np.ndarray, base_time: float) -> None:
+        """Queue a block for the worker, dropping the oldest one when it is behind."""
+        item = (block_audio, base_time)
         try:
-            # Combine audio from buffer
-            audio_chunks = [chunk for chunk, _ in self.audio_buffer]
-            combined_audio = np.concatenate(audio_chunks)
+            self.diarization_queue.put_nowait(item)
+        except queue.Full:
+            # Newer blocks carry their own left context, so the oldest pending
+            # block is the one to give up
+            try:
+                self.diarization_queue.get_nowait()
+            except queue.Empty:
+                pass
+            logger.warning("Diarization queue full, dropping oldest block")
+            self.diarization_queue.put_nowait(item)
+    
+    def _take_completed_segments(self) -> List[SpeakerSegment]:
+        """Return the segments finished by the worker since the last call."""
+        with self._segments_lock:
+            completed = self._completed_segments
+            self._completed_segments = []
+        return completed
+    
+    def _diarization_worker(self) -> None:
+        """Worker thread for real-time diarization."""
+        logger.info("Diarization worker thread started")
+        
+        while self.is_running:
+            try:
+                block_audio, base_time = self.diarization_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
             
+            new_segments = self._diarize_block(block_audio, base_time)
+            if new_segments:
+                with self._segments_lock:
+                    self._completed_segments.extend(new_segments)
+        
+        logger.info("Diarization worker thread stopped")
+    
+    def _diarize_block(self, block_audio: np.ndarray, base_time: float) -> List[SpeakerSegment]:
+        """Diarize one block and merge its new segments into the session."""
+        try:
             # Perform diarization
-            segments = self.diarize_audio(combined_audio)
+            segments = self.diarize_audio(block_audio, self.sample_rate, real_time=True)
             
             # Adjust timestamps
-            base_time = self.audio_buffer[0][1]
             for segment in segments:
                 segment.start_time += base_time
                 segment.end_time += base_time
             
-            # Update speaker segments
-            self.speaker_segments.extend(segments)
-            
-            # Create/update speaker profiles
-            self.create_speaker_profiles(segments)
+            with self._segments_lock:
+                # Give the block's speakers the IDs already assigned in the
+                # context audio, then keep only what is new since the last
+                # block. Queued blocks may overlap, so this uses the end of
+                # what has actually been diarized so far.
+                context_end = self._last_processed_end if self._last_processed_end is not None else base_time
+                self._align_speaker_labels(segments, context_end)
+                
+                new_segments = []
+                for segment in segments:
+                    if segment.end_time <= context_end:
+                        continue
+                    segment.start_time = max(segment.start_time, context_end)
+                    new_segments.append(segment)
+                
+                block_end = base_time + len(block_audio) / self.sample_rate
+                self._last_processed_end = max(block_end, context_end)
+                
+                # Update speaker segments
+                self.speaker_segments.extend(new_segments)
+                self._segment_index_dirty = True
+                
+                # Create/update speaker profiles
+                self.create_speaker_profiles(new_segments)
             
-            return segments
+            return new_segments
             
         except Exception as e:
             logger.error(f"Error in real-time diarization processing: {e}")
             return []
     
+    def _align_speaker_labels(self, segments: List[SpeakerSegment], context_end: float) -> None:
+        """
+        Rename the block-local speaker labels of freshly diarized segments.
+        
+        Each label is matched to the known speaker it overlaps most with in
+        the already-processed context audio (before context_end); labels with
+        no match get a new speaker ID.
+        """
+        # Overlap in seconds between each (local label, known speaker ID) pair
+        overlap_totals: Dict[Tuple[str, str], float] = defaultdict(float)
+        for segment in segments:
+            if segment.start_time >= context_end:
+                continue
+            
+            indices, overlaps = self._find_overlapping(
+                segment.start_time, min(segment.end_time, context_end)
+            )
+            codes = self._sorted_codes[indices]
+            for code, overlap in zip(codes.tolist(), overlaps.tolist()):
+                if overlap > 0:
+                    known_id = self.speaker_segments.speaker_labels[code]
+                    overlap_totals[(segment.speaker_id, known_id)] += overlap
+        
+        # Greedily pair labels with known speakers, largest overlap first
+        mapping: Dict[str, str] = {}
+        taken = set()
+        for (label, known_id), _ in sorted(overlap_totals.items(), key=lambda x: x[1], reverse=True):
+            if label not in mapping and known_id not in taken:
+                mapping[label] = known_id
+                taken.add(known_id)
+        
+        for segment in segments:
+            if segment.speaker_id not in mapping:
+                # No overlap with the context (e.g. after a gap): fall back to
+                # the cached voice embeddings before minting a new speaker
+                known_id = self._match_cached_speaker(segment.embedding, taken)
+                if known_id is None:
+                    known_id = self._new_speaker_id()
+                mapping[segment.speaker_id] = known_id
+                taken.add(known_id)
+            segment.speaker_id = mapping[segment.speaker_id]
+    
+    def _match_cached_speaker(self, embedding: Optional[np.ndarray], exclude: set) -> Optional[str]:
+        """Find the known speaker whose cached embedding is closest, if similar enough."""
+        if embedding is None:
+            return None
+        
+        candidates = [
+            (speaker_id, profile.voice_characteristics["embedding"])
+            for speaker_id, profile in self.known_speakers.items()
+            if speaker_id not in exclude and "embedding" in profile.voice_characteristics
+        ]
+        if not candidates:
+            return None
+        
+        centroids = np.stack([centroid for _, centroid in candidates])
+        similarity = (centroids @ embedding) / (
+            np.linalg.norm(centroids, axis=1) * np.linalg.norm(embedding) + 1e-9
+        )
+        best = int(np.argmax(similarity))
+        if similarity[best] > self.embedding_match_threshold:
+            return candidates[best][0]
+        return None
+    
+    def _new_speaker_id(self) -> str:
+        """Allocate a session-wide speaker ID."""
+        while True:
+            speaker_id = sys.intern(f"SPEAKER_{self._next_speaker_index:02d}")
+            self._next_speaker_index += 1
+            if speaker_id not in self.known_speakers:
+                return speaker_id
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get diarization statistics."""
         return {
             "is_loaded": self.is_loaded,
             "known_speakers": len(self.known_speakers),
             "total_segments": len(self.speaker_segments),
+            "queue_size": self.diarization_queue.qsize(),
             "speaker_profiles": {
                 speaker_id: {
                     "role": profile.speaker.value,
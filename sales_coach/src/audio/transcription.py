@@ -3,36 +3,71 @@
 import numpy as np
 import logging
 import threading
-import queue
 import time
-from typing import Optional, List, Dict, Any, Callable
+from collections import deque
+from itertools import islice
+from typing import Optional, List, Dict, Any, Callable, Tuple, Deque
 from dataclasses import dataclass
 from pathlib import Path
 import tempfile
 import os
+import importlib.util
 
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
-    whisper = None
-
-try:
-    import whisper_cpp as whisper_cpp
-    WHISPER_CPP_AVAILABLE = True
-except ImportError:
-    WHISPER_CPP_AVAILABLE = False
-    whisper_cpp = None
+# The Whisper backends (openai-whisper pulls in torch and tiktoken) take
+# seconds to import, so they are only probed here and imported by the
+# loader that actually uses them
+WHISPER_AVAILABLE = importlib.util.find_spec("whisper") is not None
+FASTER_WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+WHISPER_CPP_AVAILABLE = importlib.util.find_spec("whisper_cpp") is not None
+OPENVINO_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ("openvino", "optimum")
+)
 
 from ..models.config import ModelConfig
 from ..models.conversation import ConversationTurn, Speaker
 from .vad import VoiceSegment
-from .diarization import SpeakerSegment
+from .buffer_pool import SizeClassBufferPool
+from .diarization import SpeakerSegment, SpeakerSegmentArray
 
 
 logger = logging.getLogger(__name__)
 
+# Whisper works on 16kHz audio
+SAMPLE_RATE = 16000
+MIN_UTTERANCE_SAMPLES = SAMPLE_RATE // 2  # clips under 0.5 s are skipped
+MAX_BATCH_SAMPLES = SAMPLE_RATE * 30  # one Whisper window
+# Size classes for queued utterance buffers (2 s, 5 s, 10 s, 30 s)
+UTTERANCE_BUFFER_SIZES = (SAMPLE_RATE * 2, SAMPLE_RATE * 5, SAMPLE_RATE * 10, MAX_BATCH_SAMPLES)
+# Backends whose results carry no segment times to split a joined batch by
+SINGLE_CLIP_BACKENDS = ("whisper_cpp", "openvino")
+
+
+def _ensure_unit_scale(audio_data: np.ndarray) -> np.ndarray:
+    """Return float32 audio scaled into [-1, 1], unchanged if it already is."""
+    if audio_data.dtype != np.float32:
+        audio_data = audio_data.astype(np.float32)
+    if not len(audio_data):
+        return audio_data
+    
+    # Peak from min/max, which needs no temporary |x| array
+    peak = max(float(audio_data.max()), -float(audio_data.min()))
+    if peak <= 1.0:
+        return audio_data
+    return audio_data * np.float32(1.0 / peak)
+
+
+def _segments_confidence(segments: Optional[List[Dict]]) -> float:
+    """Mean of exp(avg_logprob) over segments, as an approximate confidence."""
+    if not segments:
+        return 0.0
+    
+    # One vectorized exp over all segments instead of one call per segment
+    logprobs = np.fromiter(
+        (segment["avg_logprob"] for segment in segments if "avg_logprob" in segment),
+        dtype=np.float64
+    )
+    return float(np.exp(logprobs).mean()) if logprobs.size else 0.0
+
 
 @dataclass
 class TranscriptionResult:
@@ -50,13 +85,34 @@ class WhisperTranscriber:
     def __init__(self, config: ModelConfig):
         self.config = config
         self.model = None
+        self.processor = None  # feature extractor/tokenizer for the OpenVINO backend
         self.is_loaded = False
-        self.model_type = "whisper"  # or "whisper_cpp"
-        
-        # Processing queue for real-time transcription
-        self.transcription_queue = queue.Queue(maxsize=100)
+        self.model_type = "whisper"  # or "whisper_cpp" / "faster_whisper" / "openvino"
+        self.device = "cpu"
+        
+        # Processing queue for real-time transcription. There is exactly one
+        # producer (the audio thread) and one consumer (the worker), so a
+        # deque's atomic append/popleft plus an Event for wake-ups replaces
+        # queue.Queue's lock and condition round trips.
+        self.transcription_queue: Deque[Dict[str, Any]] = deque()
+        self.max_queue_size = 100
+        self._queue_event = threading.Event()
         self.result_callback: Optional[Callable[[TranscriptionResult], None]] = None
         
+        # Latest window of speech still in progress; only the newest one is
+        # worth transcribing, and final clips always go first
+        self.partial_callback: Optional[Callable[[TranscriptionResult], None]] = None
+        self._partial_item: Optional[Dict[str, Any]] = None
+        
+        # Queued audio is copied into reusable buffers, sized by utterance
+        # length, rather than a fresh array per utterance
+        self.buffer_pool = SizeClassBufferPool(UTTERANCE_BUFFER_SIZES)
+        
+        # Batching of queued utterances into one Whisper window
+        self.max_batch_samples = MAX_BATCH_SAMPLES
+        self.batch_separator_samples = SAMPLE_RATE  # 1 s of silence between clips
+        self._carry_item: Optional[Dict[str, Any]] = None
+        
         # Worker thread
         self.worker_thread: Optional[threading.Thread] = None
         self.is_running = False
@@ -69,11 +125,35 @@ class WhisperTranscriber:
     
     def load_model(self) -> bool:
         """Load the Whisper model."""
+        if not self._load_backend():
+            return False
+        
+        self._warm_up()
+        return True
+    
+    def _load_backend(self) -> bool:
+        """Load the configured Whisper implementation, else the fastest available."""
         try:
+            preferred = {
+                "whisper_cpp": (WHISPER_CPP_AVAILABLE, self._try_load_whisper_cpp),
+                "faster_whisper": (FASTER_WHISPER_AVAILABLE, self._try_load_faster_whisper),
+                "whisper": (WHISPER_AVAILABLE, self._try_load_whisper),
+                "openvino": (OPENVINO_AVAILABLE, self._try_load_openvino),
+            }.get(self.config.whisper_backend)
+            if preferred:
+                available, loader = preferred
+                if available and loader():
+                    return True
+                logger.warning(f"Whisper backend {self.config.whisper_backend} unavailable, trying the others")
+            
             # Try whisper_cpp first (faster)
             if WHISPER_CPP_AVAILABLE and self._try_load_whisper_cpp():
                 return True
             
+            # CTranslate2 int8 inference, much faster than openai-whisper
+            if FASTER_WHISPER_AVAILABLE and self._try_load_faster_whisper():
+                return True
+            
             # Fallback to regular whisper
             if WHISPER_AVAILABLE and self._try_load_whisper():
                 return True
@@ -85,6 +165,15 @@ class WhisperTranscriber:
             logger.error(f"Failed to load Whisper model: {e}")
             return False
     
+    def _warm_up(self) -> None:
+        """
+        Transcribe one second of silence so the first real utterance does
+        not pay for lazy initialization (CUDA context and kernel selection,
+        mel filterbank loading, CTranslate2 buffers).
+        """
+        result = self.transcribe_audio(np.zeros(SAMPLE_RATE, dtype=np.float32), record_stats=False)
+        logger.info(f"Whisper warm-up took {result.processing_time:.2f}s")
+    
     def _try_load_whisper_cpp(self) -> bool:
         """Try to load whisper.cpp model."""
         try:
@@ -93,58 +182,188 @@ class WhisperTranscriber:
                 logger.warning(f"Whisper.cpp model not found at {model_path}")
                 return False
             
-            self.model = whisper_cpp.Whisper.from_pretrained(
-                str(model_path),
-                n_threads=4
-            )
+            import whisper_cpp
+            
+            n_threads = self.config.whisper_threads or os.cpu_count() or 4
+            use_gpu = self.config.whisper_device != "cpu"
+            try:
+                self.model = whisper_cpp.Whisper.from_pretrained(
+                    str(model_path),
+                    n_threads=n_threads,
+                    use_gpu=use_gpu,
+                    gpu_device=self.config.whisper_gpu_device
+                )
+            except TypeError:
+                # Older bindings have no GPU parameters (CPU-only build)
+                use_gpu = False
+                self.model = whisper_cpp.Whisper.from_pretrained(
+                    str(model_path),
+                    n_threads=n_threads
+                )
             
             self.model_type = "whisper_cpp"
+            self.device = f"gpu{self.config.whisper_gpu_device}" if use_gpu else "cpu"
             self.is_loaded = True
-            logger.info(f"Loaded whisper.cpp model: {model_path}")
+            logger.info(f"Loaded whisper.cpp model: {model_path} (backend: {self.device})")
             return True
             
         except Exception as e:
             logger.warning(f"Failed to load whisper.cpp: {e}")
             return False
     
+    def _try_load_faster_whisper(self) -> bool:
+        """Try to load a faster-whisper (CTranslate2) model."""
+        try:
+            import ctranslate2
+            from faster_whisper import WhisperModel as FasterWhisperModel
+            
+            # Ask CTranslate2 itself, so this path never imports torch
+            device = self.config.whisper_device
+            if device == "auto":
+                device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            elif device != "cuda":
+                device = "cpu"  # CTranslate2 has no MPS backend
+            compute_type = self.config.whisper_compute_type
+            if compute_type == "auto":
+                compute_type = self._select_compute_type(device)
+            
+            self.model = FasterWhisperModel(
+                self.config.whisper_model,
+                device=device,
+                device_index=self.config.whisper_gpu_device if device == "cuda" else 0,
+                compute_type=compute_type,
+                # CTranslate2 defaults to 4 threads; use all cores like whisper.cpp
+                cpu_threads=self.config.whisper_threads or os.cpu_count() or 0
+            )
+            
+            self.model_type = "faster_whisper"
+            self.device = device
+            self.is_loaded = True
+            logger.info(
+                f"Loaded faster-whisper model: {self.config.whisper_model} "
+                f"(device: {device}, compute type: {compute_type})"
+            )
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Failed to load faster-whisper: {e}")
+            return False
+    
+    def _try_load_openvino(self) -> bool:
+        """Try to load an INT8 OpenVINO Whisper model, exporting it on first use."""
+        try:
+            from optimum.intel import OVModelForSpeechSeq2Seq
+            from transformers import AutoProcessor
+            
+            model_id = f"openai/whisper-{self.config.whisper_model}"
+            export_dir = Path("models_cache") / f"openvino-whisper-{self.config.whisper_model}-int8"
+            device = "CPU" if self.config.whisper_device == "cpu" else "AUTO"
+            
+            if export_dir.exists():
+                self.model = OVModelForSpeechSeq2Seq.from_pretrained(export_dir, device=device)
+                self.processor = AutoProcessor.from_pretrained(export_dir)
+            else:
+                # One-time conversion with INT8 weight compression
+                logger.info(f"Exporting {model_id} to OpenVINO INT8 at {export_dir}...")
+                self.model = OVModelForSpeechSeq2Seq.from_pretrained(
+                    model_id, export=True, load_in_8bit=True, device=device
+                )
+                self.processor = AutoProcessor.from_pretrained(model_id)
+                self.model.save_pretrained(export_dir)
+                self.processor.save_pretrained(export_dir)
+            
+            self.model_type = "openvino"
+            self.device = device.lower()
+            self.is_loaded = True
+            logger.info(f"Loaded OpenVINO Whisper model: {self.config.whisper_model} (device: {device}, int8)")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Failed to load OpenVINO Whisper: {e}")
+            return False
+    
+    def _select_compute_type(self, device: str) -> str:
+        """Pick the fastest int8 compute type the device supports."""
+        if device != "cuda":
+            return "int8"
+        
+        import ctranslate2
+        # int8 x float16 needs tensor cores (compute capability 7.0+)
+        supported = ctranslate2.get_supported_compute_types("cuda", self.config.whisper_gpu_device)
+        return "int8_float16" if "int8_float16" in supported else "int8_float32"
+    
     def _try_load_whisper(self) -> bool:
         """Try to load regular Whisper model."""
         try:
-            self.model = whisper.load_model(self.config.whisper_model)
+            import whisper
+            
+            device = self._select_torch_device()
+            try:
+                self.model = whisper.load_model(self.config.whisper_model, device=device)
+            except Exception as e:
+                if device == "cpu":
+                    raise
+                logger.warning(f"Failed to load Whisper on {device}, using CPU: {e}")
+                device = "cpu"
+                self.model = whisper.load_model(self.config.whisper_model, device=device)
+            
             self.model_type = "whisper"
+            self.device = device
             self.is_loaded = True
-            logger.info(f"Loaded Whisper model: {self.config.whisper_model}")
+            logger.info(f"Loaded Whisper model: {self.config.whisper_model} (device: {device})")
             return True
             
         except Exception as e:
             logger.warning(f"Failed to load Whisper: {e}")
             return False
     
+    def _select_torch_device(self) -> str:
+        """Resolve the whisper_device setting to a torch device name."""
+        if self.config.whisper_device != "auto":
+            return self.config.whisper_device
+        
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+            return "mps"
+        return "cpu"
+    
     def _get_whisper_cpp_model_path(self) -> Optional[Path]:
         """Get path to whisper.cpp model file."""
-        # Common locations for whisper.cpp models
-        model_name = f"ggml-{self.config.whisper_model}.bin"
+        # Prefer the quantized weights (smaller and faster on CPU), falling
+        # back to the fp16 file
+        model_names = [f"ggml-{self.config.whisper_model}.bin"]
+        if self.config.whisper_quant != "fp16":
+            model_names.insert(0, f"ggml-{self.config.whisper_model}-{self.config.whisper_quant}.bin")
         
-        possible_paths = [
-            Path.home() / ".cache" / "whisper.cpp" / model_name,
-            Path("models_cache") / model_name,
-            Path("/usr/local/share/whisper.cpp") / model_name,
-        ]
-        
-        for path in possible_paths:
-            if path.exists():
-                return path
+        # Common locations for whisper.cpp models
+        for model_name in model_names:
+            possible_paths = [
+                Path.home() / ".cache" / "whisper.cpp" / model_name,
+                Path("models_cache") / model_name,
+                Path("/usr/local/share/whisper.cpp") / model_name,
+            ]
+            
+            for path in possible_paths:
+                if path.exists():
+                    return path
         
         return None
     
     def transcribe_audio(self, audio_data: np.ndarray, 
-                        language: Optional[str] = None) -> TranscriptionResult:
+                        language: Optional[str] = None,
+                        word_timestamps: Optional[bool] = None,
+                        record_stats: bool = True) -> TranscriptionResult:
         """
         Transcribe audio data to text.
         
         Args:
             audio_data: Audio waveform (float32, mono, 16kHz recommended)
             language: Optional language hint
+            word_timestamps: Request word timings (openai-whisper only);
+                defaults to the whisper_word_timestamps setting
+            record_stats: Count this call in the transcription statistics
             
         Returns:
             TranscriptionResult with text and metadata
@@ -161,15 +380,22 @@ class WhisperTranscriber:
         try:
             if self.model_type == "whisper_cpp":
                 result = self._transcribe_whisper_cpp(audio_data, language)
+            elif self.model_type == "faster_whisper":
+                result = self._transcribe_faster_whisper(audio_data, language)
+            elif self.model_type == "openvino":
+                result = self._transcribe_openvino(audio_data, language)
             else:
-                result = self._transcribe_whisper(audio_data, language)
+                if word_timestamps is None:
+                    word_timestamps = self.config.whisper_word_timestamps
+                result = self._transcribe_whisper(audio_data, language, word_timestamps)
             
             processing_time = time.time() - start_time
             result.processing_time = processing_time
             
             # Update statistics
-            self.total_transcriptions += 1
-            self.total_processing_time += processing_time
+            if record_stats:
+                self.total_transcriptions += 1
+                self.total_processing_time += processing_time
             
             return result
             
@@ -184,13 +410,8 @@ class WhisperTranscriber:
     def _transcribe_whisper_cpp(self, audio_data: np.ndarray, 
                                language: Optional[str]) -> TranscriptionResult:
         """Transcribe using whisper.cpp."""
-        # Ensure audio is float32 and normalized
-        if audio_data.dtype != np.float32:
-            audio_data = audio_data.astype(np.float32)
-        
-        # Whisper.cpp expects audio normalized to [-1, 1]
-        if np.max(np.abs(audio_data)) > 1.0:
-            audio_data = audio_data / np.max(np.abs(audio_data))
+        # Whisper expects float32 audio in [-1, 1]
+        audio_data = _ensure_unit_scale(audio_data)
         
         result = self.model.transcribe(audio_data, language=language or "en")
         
@@ -201,41 +422,99 @@ class WhisperTranscriber:
             segments=result.get("segments")
         )
     
+    def _transcribe_faster_whisper(self, audio_data: np.ndarray,
+                                   language: Optional[str]) -> TranscriptionResult:
+        """Transcribe using faster-whisper."""
+        # Whisper expects float32 audio in [-1, 1]
+        audio_data = _ensure_unit_scale(audio_data)
+        
+        # Segments are generated lazily; VAD has already trimmed the audio
+        segment_iter, info = self.model.transcribe(
+            audio_data,
+            language=language,
+            beam_size=1,
+            vad_filter=False,
+            # Each clip is independent; conditioning on earlier windows only
+            # feeds repetition loops
+            condition_on_previous_text=False
+        )
+        
+        # Same segment fields as openai-whisper results
+        segments = [
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob
+            }
+            for segment in segment_iter
+        ]
+        
+        return TranscriptionResult(
+            text="".join(segment["text"] for segment in segments).strip(),
+            confidence=_segments_confidence(segments),
+            language=info.language,
+            segments=segments
+        )
+    
+    def _transcribe_openvino(self, audio_data: np.ndarray,
+                             language: Optional[str]) -> TranscriptionResult:
+        """Transcribe using an OpenVINO Whisper model."""
+        # Whisper expects float32 audio in [-1, 1]
+        audio_data = _ensure_unit_scale(audio_data)
+        
+        features = self.processor(
+            audio_data, sampling_rate=SAMPLE_RATE, return_tensors="pt"
+        ).input_features
+        output = self.model.generate(
+            features,
+            language=language,
+            task="transcribe",
+            return_dict_in_generate=True,
+            output_scores=True
+        )
+        text = self.processor.batch_decode(output.sequences, skip_special_tokens=True)[0].strip()
+        
+        # One segment for the clip, scored like the other backends' segments
+        segments = []
+        if text:
+            token_logprobs = self.model.compute_transition_scores(
+                output.sequences, output.scores, normalize_logits=True
+            )
+            segments.append({
+                "start": 0.0,
+                "end": len(audio_data) / SAMPLE_RATE,
+                "text": text,
+                "avg_logprob": float(token_logprobs.mean())
+            })
+        
+        return TranscriptionResult(
+            text=text,
+            confidence=_segments_confidence(segments),
+            language=language,
+            segments=segments
+        )
+    
     def _transcribe_whisper(self, audio_data: np.ndarray, 
-                           language: Optional[str]) -> TranscriptionResult:
+                           language: Optional[str],
+                           word_timestamps: bool = False) -> TranscriptionResult:
         """Transcribe using regular Whisper."""
-        # Ensure audio is float32
-        if audio_data.dtype != np.float32:
-            audio_data = audio_data.astype(np.float32)
-        
-        # Whisper expects audio normalized to [-1, 1]
-        if np.max(np.abs(audio_data)) > 1.0:
-            audio_data = audio_data / np.max(np.abs(audio_data))
+        # Whisper expects float32 audio in [-1, 1]
+        audio_data = _ensure_unit_scale(audio_data)
         
         result = self.model.transcribe(
             audio_data,
             language=language,
             task="transcribe",
-            word_timestamps=True,
+            word_timestamps=word_timestamps,
+            fp16=self.device == "cuda",  # half precision is only a win on CUDA
             verbose=False
         )
         
-        # Calculate average confidence from segments
-        confidence = 0.0
-        if "segments" in result and result["segments"]:
-            confidences = []
-            for segment in result["segments"]:
-                if "avg_logprob" in segment:
-                    # Convert log probability to approximate confidence
-                    conf = np.exp(segment["avg_logprob"])
-                    confidences.append(conf)
-            
-            if confidences:
-                confidence = np.mean(confidences)
-        
         return TranscriptionResult(
             text=result["text"].strip(),
-            confidence=confidence,
+            confidence=_segments_confidence(result.get("segments")),
             language=result.get("language"),
             segments=result.get("segments")
         )
@@ -244,6 +523,10 @@ class WhisperTranscriber:
         """Set callback for transcription results."""
         self.result_callback = callback
     
+    def set_partial_callback(self, callback: Callable[[TranscriptionResult], None]) -> None:
+        """Set callback for partial results of speech still in progress."""
+        self.partial_callback = callback
+    
     def start_real_time_processing(self) -> None:
         """Start real-time transcription processing."""
         if self.is_running:
@@ -263,6 +546,7 @@ class WhisperTranscriber:
             return
         
         self.is_running = False
+        self._queue_event.set()  # wake the worker so it sees the flag
         
         if self.worker_thread and self.worker_thread.is_alive():
             self.worker_thread.join(timeout=2.0)
@@ -273,16 +557,39 @@ class WhisperTranscriber:
                                     timestamp: float,
                                     speaker: Optional[Speaker] = None) -> bool:
         """Queue audio data for transcription."""
-        try:
-            self.transcription_queue.put_nowait({
-                "audio_data": audio_data.copy(),
-                "timestamp": timestamp,
-                "speaker": speaker
-            })
-            return True
-        except queue.Full:
+        if len(self.transcription_queue) >= self.max_queue_size:
             logger.warning("Transcription queue full, dropping audio")
             return False
+        
+        # The final clip supersedes any pending partial of the same speech
+        partial = self._partial_item
+        if partial is not None and partial["timestamp"] == timestamp:
+            self._partial_item = None
+        
+        buffer = self.buffer_pool.copy_in(audio_data)
+        self.transcription_queue.append({
+            "audio_data": buffer[:len(audio_data)],
+            "buffer": buffer,
+            "timestamp": timestamp,
+            "speaker": speaker
+        })
+        self._queue_event.set()
+        return True
+    
+    def queue_partial_audio(self, audio_data: np.ndarray, timestamp: float) -> None:
+        """Queue a window of speech in progress, replacing any pending one."""
+        self._partial_item = {
+            "audio_data": np.array(audio_data, dtype=np.float32),
+            "timestamp": timestamp
+        }
+        self._queue_event.set()
+    
+    def _pop_queued(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued item, or None if the queue is empty."""
+        try:
+            return self.transcription_queue.popleft()
+        except IndexError:
+            return None
     
     def _transcription_worker(self) -> None:
         """Worker thread for real-time transcription."""
@@ -291,38 +598,154 @@ class WhisperTranscriber:
         while self.is_running:
             try:
                 # Get audio from queue
-                item = self.transcription_queue.get(timeout=0.1)
-                
-                audio_data = item["audio_data"]
-                timestamp = item["timestamp"]
-                speaker = item.get("speaker")
+                item = self._carry_item
+                self._carry_item = None
+                if item is None:
+                    item = self._pop_queued()
                 
-                # Skip very short audio segments (assume 16kHz sample rate)
-                if len(audio_data) < 16000 * 0.5:  # < 0.5 seconds
+                if item is None and self._partial_item is not None:
+                    partial, self._partial_item = self._partial_item, None
+                    self._transcribe_partial(partial)
                     continue
                 
-                # Transcribe
-                result = self.transcribe_audio(audio_data)
+                if item is None:
+                    # Sleep until the producer signals; the queue is checked
+                    # again after clearing, so a signal is never lost
+                    self._queue_event.wait(timeout=0.1)
+                    self._queue_event.clear()
+                    continue
                 
-                if result.text and result.text.strip():
-                    # Add metadata
-                    result.timestamp = timestamp
-                    result.speaker = speaker
-                    
-                    # Call result callback if set
-                    if self.result_callback:
-                        try:
-                            self.result_callback(result)
-                        except Exception as e:
-                            logger.error(f"Error in transcription callback: {e}")
+                # Whisper encodes a full 30 s window however short the clip,
+                # so queued utterances are transcribed together
+                batch = self._collect_batch(item)
+                if batch:
+                    self._transcribe_batch(batch)
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error in transcription worker: {e}")
         
         logger.info("Transcription worker thread stopped")
     
+    def _collect_batch(self, first_item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Gather queued items into one batch of at most max_batch_samples.
+        
+        Very short clips are dropped here; an item that would overflow the
+        batch is carried over to the next one.
+        """
+        max_items = 1 if self.model_type in SINGLE_CLIP_BACKENDS else None
+        
+        batch = []
+        total_samples = 0
+        item = first_item
+        while item is not None:
+            n = len(item["audio_data"])
+            added = n + self.batch_separator_samples if batch else n
+            
+            # Skip very short audio segments (assume 16kHz sample rate)
+            if n < MIN_UTTERANCE_SAMPLES:
+                self.buffer_pool.release(item.get("buffer"))
+            elif batch and total_samples + added > self.max_batch_samples:
+                self._carry_item = item
+                break
+            else:
+                batch.append(item)
+                total_samples += added
+                if max_items is not None and len(batch) >= max_items:
+                    break
+            
+            item = self._pop_queued()
+        
+        return batch
+    
+    def _transcribe_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Transcribe a batch of queued items and emit one result per item."""
+        try:
+            if len(batch) == 1:
+                results = [self.transcribe_audio(batch[0]["audio_data"])]
+            else:
+                results = self._transcribe_joined(batch)
+        finally:
+            # The audio is no longer needed once Whisper has run
+            for item in batch:
+                self.buffer_pool.release(item.get("buffer"))
+        
+        for item, result in zip(batch, results):
+            if result.text and result.text.strip():
+                # Add metadata
+                result.timestamp = item["timestamp"]
+                result.speaker = item.get("speaker")
+                
+                # Call result callback if set
+                if self.result_callback:
+                    try:
+                        self.result_callback(result)
+                    except Exception as e:
+                        logger.error(f"Error in transcription callback: {e}")
+    
+    def _transcribe_partial(self, item: Dict[str, Any]) -> None:
+        """Transcribe a window of speech in progress for live display."""
+        if not self.partial_callback:
+            return
+        
+        # Partials are re-transcribed as final clips; count only those
+        result = self.transcribe_audio(item["audio_data"], record_stats=False)
+        if result.text and result.text.strip():
+            result.timestamp = item["timestamp"]
+            try:
+                self.partial_callback(result)
+            except Exception as e:
+                logger.error(f"Error in partial transcription callback: {e}")
+    
+    def transcribe_clips(self, clips: List[np.ndarray]) -> List[TranscriptionResult]:
+        """
+        Transcribe several clips, in one Whisper call where the backend allows.
+        
+        The clips plus 1 s separators should fit in max_batch_samples.
+        """
+        if len(clips) == 1 or self.model_type in SINGLE_CLIP_BACKENDS:
+            return [self.transcribe_audio(clip) for clip in clips]
+        return self._transcribe_joined([{"audio_data": clip} for clip in clips])
+    
+    def _transcribe_joined(self, batch: List[Dict[str, Any]]) -> List[TranscriptionResult]:
+        """
+        Transcribe several items in one Whisper call.
+        
+        The clips are joined with short silences and the output segments are
+        assigned back to the clip containing their midpoint.
+        """
+        total_samples = sum(len(item["audio_data"]) for item in batch)
+        total_samples += self.batch_separator_samples * (len(batch) - 1)
+        joined = np.zeros(total_samples, dtype=np.float32)
+        
+        offsets = np.empty(len(batch), dtype=np.int64)
+        offset = 0
+        for i, item in enumerate(batch):
+            n = len(item["audio_data"])
+            offsets[i] = offset
+            joined[offset:offset + n] = item["audio_data"]
+            offset += n + self.batch_separator_samples
+        
+        combined = self.transcribe_audio(joined)
+        
+        item_segments: List[List[Dict]] = [[] for _ in batch]
+        for segment in combined.segments or []:
+            midpoint = int((segment["start"] + segment["end"]) * (SAMPLE_RATE / 2))
+            index = max(0, int(np.searchsorted(offsets, midpoint, side='right')) - 1)
+            item_segments[index].append(segment)
+        
+        results = []
+        for segments in item_segments:
+            results.append(TranscriptionResult(
+                text="".join(segment["text"] for segment in segments).strip(),
+                confidence=_segments_confidence(segments),
+                language=combined.language,
+                segments=segments,
+                processing_time=combined.processing_time
+            ))
+        
+        return results
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get transcription statistics."""
         avg_processing_time = 0.0
@@ -333,10 +756,11 @@ class WhisperTranscriber:
             "is_loaded": self.is_loaded,
             "model_type": self.model_type,
             "model_name": self.config.whisper_model,
+            "device": self.device,
             "total_transcriptions": self.total_transcriptions,
             "total_processing_time": self.total_processing_time,
             "average_processing_time": avg_processing_time,
-            "queue_size": self.transcription_queue.qsize(),
+            "queue_size": len(self.transcription_queue),
             "is_running": self.is_running
         }
 
@@ -346,21 +770,56 @@ class TranscriptionPipeline:
     
     def __init__(self, transcriber: WhisperTranscriber):
         self.transcriber = transcriber
-        self.conversation_turns: List[ConversationTurn] = []
+        # Bounded history; the coaching system keeps its own conversation
+        self.conversation_turns: Deque[ConversationTurn] = deque(maxlen=1000)
         
         # Set up transcription callback
         self.transcriber.set_result_callback(self._handle_transcription_result)
         
         # External callbacks
         self.turn_callback: Optional[Callable[[ConversationTurn], None]] = None
+        
+        # Partial results: 3 s windows of the speech in progress, advanced
+        # every 2 s (1 s overlap)
+        self.partial_window_samples = SAMPLE_RATE * 3
+        self.partial_step_samples = SAMPLE_RATE * 2
+        self._partial_start: Optional[float] = None
+        self._partial_samples_sent = 0
     
     def set_turn_callback(self, callback: Callable[[ConversationTurn], None]) -> None:
         """Set callback for new conversation turns."""
         self.turn_callback = callback
     
+    def set_partial_callback(self, callback: Callable[[TranscriptionResult], None]) -> None:
+        """Set callback for partial transcripts of speech still in progress."""
+        self.transcriber.set_partial_callback(callback)
+    
+    def process_partial_speech(self, start_time: float, audio_data: np.ndarray) -> None:
+        """
+        Offer the speech captured so far for a partial transcript.
+        
+        Instead of waiting for the end of the utterance, the latest window is
+        transcribed each time enough new audio has arrived.
+        """
+        if not self.transcriber.partial_callback:
+            return
+        
+        if start_time != self._partial_start:
+            self._partial_start = start_time
+            self._partial_samples_sent = 0
+        
+        if len(audio_data) - self._partial_samples_sent < self.partial_step_samples:
+            return
+        
+        self._partial_samples_sent = len(audio_data)
+        self.transcriber.queue_partial_audio(audio_data[-self.partial_window_samples:], start_time)
+    
     def process_voice_segments(self, voice_segments: List[VoiceSegment],
                               speaker_segments: List[SpeakerSegment]) -> None:
         """Process voice segments with speaker information."""
+        # Speaker segment bounds as start-sorted arrays, built once per call
+        starts, ends = self._segment_bounds(speaker_segments)
+        
         for voice_segment in voice_segments:
             if voice_segment.audio_data is None:
                 continue
@@ -369,7 +828,8 @@ class TranscriptionPipeline:
             speaker = self._find_speaker_for_segment(
                 voice_segment.start_time,
                 voice_segment.end_time,
-                speaker_segments
+                starts,
+                ends
             )
             
             # Queue for transcription
@@ -379,25 +839,27 @@ class TranscriptionPipeline:
                 speaker
             )
     
+    @staticmethod
+    def _segment_bounds(speaker_segments: List[SpeakerSegment]) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end times of speaker segments, sorted by start time."""
+        if isinstance(speaker_segments, SpeakerSegmentArray):
+            starts, ends = speaker_segments.starts, speaker_segments.ends
+        else:
+            n = len(speaker_segments)
+            starts = np.fromiter((segment.start_time for segment in speaker_segments), dtype=np.float64, count=n)
+            ends = np.fromiter((segment.end_time for segment in speaker_segments), dtype=np.float64, count=n)
+        
+        order = np.argsort(starts, kind='stable')
+        return starts[order], ends[order]
+    
     def _find_speaker_for_segment(self, start_time: float, end_time: float,
-                                 speaker_segments: List[SpeakerSegment]) -> Optional[Speaker]:
+                                 starts: np.ndarray, ends: np.ndarray) -> Optional[Speaker]:
         """Find the speaker for a voice segment."""
-        # Find overlapping speaker segments
-        overlapping = []
-        
-        for speaker_segment in speaker_segments:
-            if (speaker_segment.start_time <= end_time and 
-                speaker_segment.end_time >= start_time):
-                
-                overlap = min(speaker_segment.end_time, end_time) - max(speaker_segment.start_time, start_time)
-                overlapping.append((speaker_segment, overlap))
-        
-        if not overlapping:
+        # Only segments starting by end_time can overlap it
+        candidates = int(np.searchsorted(starts, end_time, side='right'))
+        if not np.any(ends[:candidates] >= start_time):
             return None
         
-        # Return speaker with maximum overlap
-        best_segment = max(overlapping, key=lambda x: x[1])[0]
-        
         # Map speaker ID to role (this would be determined by the diarization system)
         # For now, return UNKNOWN - the diarization system should handle role mapping
         return Speaker.UNKNOWN
@@ -427,7 +889,9 @@ class TranscriptionPipeline:
     
     def get_recent_turns(self, count: int = 10) -> List[ConversationTurn]:
         """Get recent conversation turns."""
-        return self.conversation_turns[-count:] if len(self.conversation_turns) >= count else self.conversation_turns
+        recent = list(islice(reversed(self.conversation_turns), max(0, count)))
+        recent.reverse()
+        return recent
     
     def clear_history(self) -> None:
         """Clear conversation history."""
@@ -3,7 +3,10 @@
 import torch
 import numpy as np
 import logging
-from typing import List, Tuple, Optional, Dict, Any
+import math
+import bisect
+from collections import deque
+from typing import List, Tuple, Optional, Dict, Any, Deque
 from dataclasses import dataclass
 from pathlib import Path
 import threading
@@ -14,6 +17,18 @@ from ..models.config import AudioConfig
 
 logger = logging.getLogger(__name__)
 
+# Utterance length the speech buffer is sized for up front; longer speech
+# still works but grows the buffer
+MAX_UTTERANCE_SECONDS = 30.0
+
+
+def _mean_square(audio_chunk: np.ndarray) -> float:
+    """Mean of squared samples in one BLAS dot pass, without temporaries."""
+    n = len(audio_chunk)
+    if n == 0:
+        return 0.0
+    return float(np.dot(audio_chunk, audio_chunk)) / n
+
 
 @dataclass
 class VoiceSegment:
@@ -36,14 +51,21 @@ class SileroVAD:
         self.model = None
         self.sample_rate = config.sample_rate
         self.threshold = config.vad_threshold
+        self._resampler = None  # built at load time when sample_rate != 16kHz
+        self._vad_input: Optional[torch.Tensor] = None  # reused for non-float32 chunks
         
         # State tracking
         self.is_loaded = False
         self.current_speech_start: Optional[float] = None
-        self.voice_segments: List[VoiceSegment] = []
+        # Oldest first; bounded so a long call cannot grow it without limit
+        # even if cleanup_old_segments is never called
+        self.voice_segments: Deque[VoiceSegment] = deque(maxlen=1000)
         
-        # Buffer for processing
-        self.audio_buffer = []
+        # Buffer for processing. Speech for the current segment is written
+        # in place at a cursor (grown by doubling when needed) instead of
+        # collecting chunk copies and concatenating them.
+        self.audio_buffer = np.empty(int(self.sample_rate * MAX_UTTERANCE_SECONDS), dtype=np.float32)
+        self.audio_buffer_length = 0
         self.buffer_size = int(self.sample_rate * 0.5)  # 500ms buffer
         
         logger.info(f"Initializing Silero VAD with threshold {self.threshold}")
@@ -51,19 +73,40 @@ class SileroVAD:
     def load_model(self) -> bool:
         """Load the Silero VAD model."""
         try:
-            # Try to load Silero VAD model
-            model, utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=False
-            )
+            # Try to load Silero VAD model. The ONNX export runs through ONNX
+            # Runtime on a single thread, which has far less per-call overhead
+            # than eager PyTorch for the tiny chunks VAD sees.
+            model, utils = None, None
+            if self.config.vad_onnx:
+                try:
+                    model, utils = torch.hub.load(
+                        repo_or_dir='snakers4/silero-vad',
+                        model='silero_vad',
+                        force_reload=False,
+                        onnx=True
+                    )
+                except Exception as e:
+                    logger.info(f"ONNX Silero VAD unavailable, using PyTorch: {e}")
+            
+            if model is None:
+                model, utils = torch.hub.load(
+                    repo_or_dir='snakers4/silero-vad',
+                    model='silero_vad',
+                    force_reload=False,
+                    onnx=False
+                )
             
             self.model = model
             self.get_speech_timestamps, self.save_audio, self.read_audio, self.VADIterator, self.collect_chunks = utils
             
-            # Set model to evaluation mode
-            self.model.eval()
+            # Set model to evaluation mode (the ONNX wrapper has no modes)
+            if hasattr(self.model, "eval"):
+                self.model.eval()
+                self.model = self._freeze_for_inference(self.model)
+            
+            # The stream rate is fixed, so build the resampler once
+            if self.sample_rate != 16000:
+                self._resampler = self._build_resampler()
             
             self.is_loaded = True
             logger.info("Silero VAD model loaded successfully")
@@ -81,38 +124,28 @@ class SileroVAD:
         Returns:
             Tuple of (has_voice, confidence)
         """
-        # Apply noise gate - skip very quiet audio
-        rms = np.sqrt(np.mean(audio_chunk**2))
+        # Apply noise gate - skip very quiet audio. Compared on the squared
+        # scale so the gate needs no square root.
+        mean_square = _mean_square(audio_chunk)
         noise_gate_threshold = 0.0005  # Lowered for quiet microphones (was 0.01)
         
-        if rms < noise_gate_threshold:
+        if mean_square < noise_gate_threshold * noise_gate_threshold:
             return False, 0.0
         
         if not self.is_loaded:
             # Fallback to energy-based VAD
-            return self._energy_based_vad(audio_chunk)
+            return self._energy_based_vad(audio_chunk, mean_square)
         
         try:
-            # Ensure audio is the right type and shape
-            if audio_chunk.dtype != np.float32:
-                audio_chunk = audio_chunk.astype(np.float32)
-            
-            # Convert to tensor
-            audio_tensor = torch.from_numpy(audio_chunk)
+            # Convert to a float32 tensor
+            audio_tensor = self._to_input_tensor(audio_chunk)
             
             # Silero VAD expects 16kHz audio
-            if self.sample_rate != 16000:
-                # Simple resampling (for production, use proper resampling)
-                target_length = int(len(audio_chunk) * 16000 / self.sample_rate)
-                audio_tensor = torch.nn.functional.interpolate(
-                    audio_tensor.unsqueeze(0).unsqueeze(0),
-                    size=target_length,
-                    mode='linear',
-                    align_corners=False
-                ).squeeze()
+            if self._resampler is not None:
+                audio_tensor = self._resampler(audio_tensor)
             
             # Get voice probability
-            with torch.no_grad():
+            with torch.inference_mode():
                 voice_prob = self.model(audio_tensor, 16000).item()
             
             has_voice = voice_prob > self.threshold
@@ -123,10 +156,77 @@ class SileroVAD:
             logger.warning(f"Error in Silero VAD, falling back to energy-based: {e}")
             return self._energy_based_vad(audio_chunk)
     
-    def _energy_based_vad(self, audio_chunk: np.ndarray) -> Tuple[bool, float]:
+    def count_voiced_frames(self, audio: np.ndarray, frame_seconds: float = 0.032) -> int:
+        """
+        Count voiced frames in a standalone clip.
+        
+        The model state is reset first so the clip is scored on its own.
+        32 ms is the window Silero VAD takes at 16kHz.
+        """
+        if self.is_loaded and hasattr(self.model, "reset_states"):
+            self.model.reset_states()
+        
+        frame = int(self.sample_rate * frame_seconds)
+        return sum(
+            self.detect_voice_activity(audio[i:i + frame])[0]
+            for i in range(0, len(audio) - frame + 1, frame)
+        )
+    
+    def _to_input_tensor(self, audio_chunk: np.ndarray) -> torch.Tensor:
+        """Float32 tensor for a chunk without allocating on every call."""
+        if audio_chunk.dtype == np.float32 and audio_chunk.flags.c_contiguous:
+            # Shares memory with the chunk, no copy
+            return torch.from_numpy(audio_chunk)
+        
+        # Convert into a persistent buffer instead of astype() per chunk
+        n = len(audio_chunk)
+        if self._vad_input is None or len(self._vad_input) < n:
+            self._vad_input = torch.empty(n, dtype=torch.float32)
+        audio_tensor = self._vad_input[:n]
+        audio_tensor.copy_(torch.from_numpy(np.ascontiguousarray(audio_chunk)))
+        return audio_tensor
+    
+    def _freeze_for_inference(self, model):
+        """Freeze a TorchScript model so constants and batch norms are folded."""
+        if not isinstance(model, torch.jit.ScriptModule):
+            return model
+        
+        try:
+            # Keep the state-reset method Silero's callers rely on
+            frozen = torch.jit.freeze(model, preserved_attrs=["reset_states"])
+            return torch.jit.optimize_for_inference(frozen)
+        except Exception as e:
+            logger.debug(f"Could not freeze Silero VAD model, using it as loaded: {e}")
+            return model
+    
+    def _build_resampler(self):
+        """Build a polyphase resampler from the stream rate to 16kHz."""
+        try:
+            import torchaudio
+            return torchaudio.transforms.Resample(
+                orig_freq=self.sample_rate,
+                new_freq=16000,
+                resampling_method='sinc_interp_kaiser'
+            )
+        except ImportError:
+            from scipy.signal import resample_poly
+            
+            divisor = math.gcd(16000, self.sample_rate)
+            up, down = 16000 // divisor, self.sample_rate // divisor
+            
+            def resample(audio_tensor):
+                resampled = resample_poly(audio_tensor.numpy(), up, down)
+                return torch.from_numpy(resampled.astype(np.float32))
+            
+            return resample
+    
+    def _energy_based_vad(self, audio_chunk: np.ndarray,
+                          mean_square: Optional[float] = None) -> Tuple[bool, float]:
         """Fallback energy-based voice activity detection."""
         # Calculate RMS energy
-        rms = np.sqrt(np.mean(audio_chunk**2))
+        if mean_square is None:
+            mean_square = _mean_square(audio_chunk)
+        rms = math.sqrt(mean_square)
         
         # Use higher threshold for energy-based VAD to reduce false positives
         energy_threshold = max(self.threshold, 0.05)  # Minimum 0.05 threshold
@@ -149,7 +249,6 @@ class SileroVAD:
         """
         has_voice, confidence = self.detect_voice_activity(audio_chunk)
         
-        chunk_duration = len(audio_chunk) / self.sample_rate
         completed_segments = []
         
         if has_voice:
@@ -157,10 +256,10 @@ class SileroVAD:
             if self.current_speech_start is None:
                 # Start of new speech segment
                 self.current_speech_start = timestamp
-                self.audio_buffer = [audio_chunk.copy()]
-            else:
-                # Continuation of speech
-                self.audio_buffer.append(audio_chunk.copy())
+                self.audio_buffer_length = 0
+            
+            # Start or continuation of speech
+            self._append_speech(audio_chunk)
         else:
             # No voice detected
             if self.current_speech_start is not None:
@@ -169,7 +268,7 @@ class SileroVAD:
                     start_time=self.current_speech_start,
                     end_time=timestamp,
                     confidence=confidence,
-                    audio_data=np.concatenate(self.audio_buffer) if self.audio_buffer else None
+                    audio_data=self.audio_buffer[:self.audio_buffer_length].copy() if self.audio_buffer_length else None
                 )
                 
                 # Only keep segments longer than minimum duration (e.g., 0.5 seconds)
@@ -179,10 +278,34 @@ class SileroVAD:
                 
                 # Reset state
                 self.current_speech_start = None
-                self.audio_buffer = []
+                self.audio_buffer_length = 0
         
         return completed_segments
     
+    def get_current_speech(self) -> Optional[Tuple[float, np.ndarray]]:
+        """
+        Speech captured so far for the segment still in progress.
+        
+        Returns:
+            Tuple of (segment start time, audio view), or None outside speech.
+            The view is only valid until the next chunk is processed.
+        """
+        if self.current_speech_start is None or not self.audio_buffer_length:
+            return None
+        return self.current_speech_start, self.audio_buffer[:self.audio_buffer_length]
+    
+    def _append_speech(self, audio_chunk: np.ndarray) -> None:
+        """Append a chunk to the current speech segment's buffer."""
+        n = len(audio_chunk)
+        end = self.audio_buffer_length + n
+        if end > len(self.audio_buffer):
+            grown = np.empty(max(end, 2 * len(self.audio_buffer)), dtype=np.float32)
+            grown[:self.audio_buffer_length] = self.audio_buffer[:self.audio_buffer_length]
+            self.audio_buffer = grown
+        
+        np.copyto(self.audio_buffer[self.audio_buffer_length:end], audio_chunk, casting='unsafe')
+        self.audio_buffer_length = end
+    
     def get_recent_segments(self, duration: float = 30.0) -> List[VoiceSegment]:
         """Get voice segments from the last N seconds."""
         if not self.voice_segments:
@@ -191,10 +314,14 @@ class SileroVAD:
         current_time = time.time()
         cutoff_time = current_time - duration
         
-        return [
-            segment for segment in self.voice_segments
-            if segment.end_time >= cutoff_time
-        ]
+        # Segments are stored in time order, so walk back from the newest
+        recent_segments = []
+        for segment in reversed(self.voice_segments):
+            if segment.end_time < cutoff_time:
+                break
+            recent_segments.append(segment)
+        recent_segments.reverse()
+        return recent_segments
     
     def cleanup_old_segments(self, keep_duration: float = 300.0) -> None:
         """Remove old voice segments to manage memory."""
@@ -204,11 +331,9 @@ class SileroVAD:
         current_time = time.time()
         cutoff_time = current_time - keep_duration
         
-        # Keep only recent segments
-        self.voice_segments = [
-            segment for segment in self.voice_segments
-            if segment.end_time >= cutoff_time
-        ]
+        # Drop expired segments from the front instead of rebuilding the list
+        while self.voice_segments and self.voice_segments[0].end_time < cutoff_time:
+            self.voice_segments.popleft()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get VAD statistics."""
@@ -237,6 +362,77 @@ class SileroVAD:
         }
 
 
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P² algorithm (Jain & Chlamtac).
+    
+    Keeps five markers instead of the samples, so each update is O(1) in
+    time and memory.
+    """
+    
+    def __init__(self, p: float):
+        self.p = p
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget all samples."""
+        p = self.p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0]
+        self._increments = [0.0, p / 2, p, (1.0 + p) / 2, 1.0]
+    
+    def add(self, x: float) -> None:
+        """Add a sample to the estimate."""
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            bisect.insort(q, x)
+            return
+        
+        n = self._positions
+        
+        # Find the cell containing x, extending the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+        
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+    
+    @property
+    def value(self) -> Optional[float]:
+        """Current quantile estimate, or None before any samples."""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return self._heights[int(round(self.p * (self.count - 1)))]
+        return self._heights[2]
+
+
 class AdaptiveVAD:
     """Adaptive VAD that adjusts threshold based on environment."""
     
@@ -244,69 +440,64 @@ class AdaptiveVAD:
         self.config = config
         self.base_vad = SileroVAD(config)
         
-        # Adaptive parameters
+        # Adaptive parameters. The noise floor is the 20th percentile of
+        # the energy of non-speech chunks, estimated online over blocks of
+        # adaptation_window samples so it follows the current environment.
         self.noise_floor = 0.001
-        self.noise_samples = []
-        self.adaptation_window = 1000  # samples
+        self.adaptation_window = 100  # samples
+        self.noise_quantile = P2Quantile(0.2)
         
-        # Background noise estimation
+        # Adaptation runs inline as noise samples arrive; no thread needed
         self.background_thread: Optional[threading.Thread] = None
         self.is_adapting = False
     
     def start_adaptation(self) -> None:
-        """Start background noise adaptation."""
+        """Start noise adaptation."""
         self.is_adapting = True
-        self.background_thread = threading.Thread(target=self._adaptation_worker)
-        self.background_thread.daemon = True
-        self.background_thread.start()
-        
-        logger.info("Started adaptive VAD background processing")
+        logger.info("Started adaptive VAD noise tracking")
     
     def stop_adaptation(self) -> None:
-        """Stop background noise adaptation."""
+        """Stop noise adaptation."""
         self.is_adapting = False
-        if self.background_thread and self.background_thread.is_alive():
-            self.background_thread.join(timeout=1.0)
     
-    def _adaptation_worker(self) -> None:
-        """Background worker for noise adaptation."""
-        while self.is_adapting:
-            try:
-                # Update noise floor estimation
-                if len(self.noise_samples) > 100:
-                    self.noise_floor = np.percentile(self.noise_samples[-100:], 20)
-                    
-                    # Adapt threshold based on noise floor
-                    adaptive_threshold = max(
-                        self.config.vad_threshold,
-                        self.noise_floor * 3.0  # 3x noise floor
-                    )
-                    self.base_vad.threshold = adaptive_threshold
-                
-                time.sleep(1.0)  # Update every second
-                
-            except Exception as e:
-                logger.error(f"Error in VAD adaptation: {e}")
+    def _update_noise_floor(self, energy: float) -> None:
+        """Feed a non-speech energy sample and adapt the threshold per block."""
+        self.noise_quantile.add(energy)
+        if self.noise_quantile.count < self.adaptation_window:
+            return
+        
+        self.noise_floor = self.noise_quantile.value
+        self.noise_quantile.reset()
+        
+        if self.is_adapting:
+            # Adapt threshold based on noise floor
+            adaptive_threshold = max(
+                self.config.vad_threshold,
+                self.noise_floor * 3.0  # 3x noise floor
+            )
+            self.base_vad.threshold = adaptive_threshold
     
     def detect_voice_activity(self, audio_chunk: np.ndarray) -> Tuple[bool, float]:
         """Detect voice activity with adaptation."""
         # Calculate energy for noise estimation
-        energy = np.sqrt(np.mean(audio_chunk**2))
+        energy = math.sqrt(_mean_square(audio_chunk))
         
         # Use base VAD for detection
         has_voice, confidence = self.base_vad.detect_voice_activity(audio_chunk)
         
-        # Update noise samples when no voice is detected
+        # Update noise estimate when no voice is detected
         if not has_voice:
-            self.noise_samples.append(energy)
-            if len(self.noise_samples) > self.adaptation_window:
-                self.noise_samples = self.noise_samples[-self.adaptation_window:]
+            self._update_noise_floor(energy)
         
         return has_voice, confidence
     
     def process_audio_stream(self, audio_chunk: np.ndarray, timestamp: float) -> List[VoiceSegment]:
         """Process audio stream with adaptive VAD."""
         return self.base_vad.process_audio_stream(audio_chunk, timestamp)
+    
+    def get_current_speech(self) -> Optional[Tuple[float, np.ndarray]]:
+        """Speech captured so far for the segment still in progress."""
+        return self.base_vad.get_current_speech()
 
 
 def create_vad(config: AudioConfig, adaptive: bool = True) -> SileroVAD:
@@ -1,13 +1,20 @@
 """Sales coaching system using LLM for analysis and advice generation."""
 
-import json
 import logging
+import importlib.util
 import time
 import threading
-from typing import List, Optional, Dict, Any, Callable
+import queue
+import itertools
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Dict, Any, Callable, Union
 from datetime import datetime
 from pathlib import Path
 
+from pydantic import BaseModel
+
 try:
     from llama_cpp import Llama
     LLAMA_CPP_AVAILABLE = True
@@ -15,7 +22,21 @@ except ImportError:
     LLAMA_CPP_AVAILABLE = False
     Llama = None
 
+try:
+    from llama_cpp import LlamaRAMCache
+except ImportError:
+    LlamaRAMCache = None
+
+try:
+    from llama_cpp import LlamaGrammar
+except ImportError:
+    LlamaGrammar = None
+
+# vLLM imports torch and CUDA libraries, so it is only imported once selected
+VLLM_AVAILABLE = importlib.util.find_spec("vllm") is not None
+
 from ..models.config import ModelConfig, CoachingConfig
+from .speculative import LlamaModelDraft
 from ..models.conversation import (
     ConversationTurn, ConversationAnalysis, CoachingAdvice, 
     CoachingResponse, ConversationState, ConversationStage,
@@ -26,19 +47,139 @@ from ..models.conversation import (
 logger = logging.getLogger(__name__)
 
 
+# Static part of the analysis prompt. It never changes between calls, so it
+# always forms the start of the cached prompt prefix.
+ANALYSIS_PROMPT_PREFIX = """<|system|>
+You are an expert sales coach analyzing live sales conversations. Provide structured coaching advice in JSON format.<|end|>
+<|user|>
+Analyze the sales conversation below, taking the current CONTEXT into account.
+
+Provide coaching advice in this exact JSON format:
+{
+    "analysis": {
+        "customer_concern": "main concern or null",
+        "conversation_stage": "DISCOVERY|QUALIFICATION|SOLUTION_PRESENTATION|OBJECTION_HANDLING|CLOSING|FOLLOW_UP",
+        "customer_sentiment": "positive|neutral|negative"
+    },
+    "primary_advice": {
+        "priority": "HIGH|MEDIUM|LOW",
+        "category": "QUESTIONING|LISTENING|OBJECTION_HANDLING|VALUE_PROPOSITION|CLOSING|RAPPORT_BUILDING",
+        "insight": "brief insight",
+        "suggested_action": "specific action"
+    },
+    "confidence": 0.8
+}
+"""
+
+ANALYSIS_STOP_SEQUENCES = ["<|end|>", "<|user|>", "<|system|>"]
+
+CONVERSATION_HEADER = "\nCONVERSATION:\n"
+
+# Per-call context that closes the prompt, filled with str.format_map
+ANALYSIS_CONTEXT_TEMPLATE = """
+CONTEXT:
+- Stage: {current_stage}
+- Talk ratio: {talk_ratio:.1f} ({talk_ratio_desc})
+- Duration: {duration_minutes:.1f} minutes<|end|>
+<|assistant|>"""
+
+
+class CoachingLLMResponse(BaseModel):
+    """The JSON object the LLM is asked to produce."""
+    
+    analysis: ConversationAnalysis
+    primary_advice: CoachingAdvice
+    confidence: float
+
+
+# Queued to wake the analysis worker and make it exit
+_STOP_ANALYSIS = object()
+
+# Analysis queue priorities, lower runs first
+PRIORITY_STOP = 0
+PRIORITY_FORCED = 1
+PRIORITY_PERIODIC = 2
+
+# GBNF grammar for the JSON schema above (same keys, same order). With it,
+# llama.cpp can only sample valid responses, so parsing never fails.
+ANALYSIS_GRAMMAR = r'''
+root ::= "{" ws "\"analysis\":" ws analysis "," ws "\"primary_advice\":" ws advice "," ws "\"confidence\":" ws confidence ws "}"
+analysis ::= "{" ws "\"customer_concern\":" ws (string | "null") "," ws "\"conversation_stage\":" ws stage "," ws "\"customer_sentiment\":" ws sentiment ws "}"
+advice ::= "{" ws "\"priority\":" ws priority "," ws "\"category\":" ws category "," ws "\"insight\":" ws string "," ws "\"suggested_action\":" ws string ws "}"
+stage ::= "\"" ("DISCOVERY" | "QUALIFICATION" | "SOLUTION_PRESENTATION" | "OBJECTION_HANDLING" | "CLOSING" | "FOLLOW_UP") "\""
+sentiment ::= "\"" ("positive" | "neutral" | "negative") "\""
+priority ::= "\"" ("HIGH" | "MEDIUM" | "LOW") "\""
+category ::= "\"" ("QUESTIONING" | "LISTENING" | "OBJECTION_HANDLING" | "VALUE_PROPOSITION" | "CLOSING" | "RAPPORT_BUILDING") "\""
+confidence ::= "0" ("." [0-9] [0-9]?)? | "1" (".0")?
+string ::= "\"" ([^"\\\x00-\x1f] | "\\" ["\\/bfnrt])* "\""
+ws ::= [ \t\n]*
+'''
+
+
+# Token budget used to size the llama.cpp context for the analysis prompt
+PROMPT_PREFIX_TOKEN_BUDGET = 384
+PROMPT_TURN_TOKEN_BUDGET = 96
+PROMPT_TAIL_TOKEN_BUDGET = 64
+
+class _JsonObjectEnd:
+    """Detects the end of the outermost JSON object in streamed text."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Consume more text; True once the outermost object has closed."""
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+# Discovered model files, shared by all coach instances in the process
+_model_path_cache: Dict[tuple, Path] = {}
+_model_path_lock = threading.Lock()
+
+
 class SalesCoachLLM:
     """LLM-based sales coaching system."""
     
-    def __init__(self, model_config: ModelConfig, coaching_config: CoachingConfig):
+    def __init__(self, model_config: ModelConfig, coaching_config: CoachingConfig,
+                 session_id: Optional[str] = None):
         self.model_config = model_config
         self.coaching_config = coaching_config
         
-        self.model: Optional[Llama] = None
+        self.model: Optional[Any] = None  # Llama or vllm.LLM
+        self.backend = model_config.llm_backend
+        self.sampling_params = None  # vLLM only
+        self.grammar = None  # llama.cpp only
+        self.draft_model: Optional[LlamaModelDraft] = None  # llama.cpp only
+        
+        # Token ids of the static prefix and of already formatted turns, so
+        # each analysis only tokenizes new turns and the context tail
+        self._prefix_tokens: Optional[List[int]] = None
+        self._turn_tokens: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._turn_tokens_max = 512
+        self._history_start: Optional[ConversationTurn] = None  # first turn kept after trimming
         self.is_loaded = False
         
         # Coaching state
         self.conversation_state = ConversationState(
-            session_id=f"session_{int(time.time())}",
+            session_id=session_id or f"session_{int(time.time())}",
             started_at=datetime.now()
         )
         
@@ -46,14 +187,25 @@ class SalesCoachLLM:
         self.coaching_callback: Optional[Callable[[CoachingResponse], None]] = None
         
         # Threading for non-blocking analysis
-        self.analysis_queue: List[Dict[str, Any]] = []
+        # Entries are (priority, sequence, request); the worker thread is the
+        # only user of the model
+        self.analysis_queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._request_seq = itertools.count()
+        self.skipped_analyses = 0  # superseded before they were analyzed
         self.analysis_thread: Optional[threading.Thread] = None
         self.is_analyzing = False
+        self._worker_lock = threading.Lock()  # guards starting/stopping the worker
+        # Held while the model and the token caches are in use, so reset()
+        # never runs in the middle of an analysis
+        self._model_lock = threading.Lock()
         
         logger.info("Initializing sales coaching LLM")
     
     def load_model(self) -> bool:
         """Load the LLM model."""
+        if self.backend == "vllm":
+            return self._load_vllm()
+        
         if not LLAMA_CPP_AVAILABLE:
             logger.error("llama-cpp-python not available. Install with: pip install llama-cpp-python")
             return False
@@ -64,16 +216,39 @@ class SalesCoachLLM:
             return False
         
         try:
+            # Only passed when set, as older bindings lack the argument
+            llama_kwargs = {}
+            self.draft_model = self._load_draft_model()
+            if self.draft_model:
+                llama_kwargs["draft_model"] = self.draft_model
+            
             self.model = Llama(
                 model_path=str(model_path),
-                n_ctx=self.model_config.llm_context_length,
+                n_ctx=self._context_length(),
                 n_threads=4,  # Optimize for M3 MacBook Air
                 n_gpu_layers=-1,  # Use Metal acceleration on macOS
+                n_batch=512,
+                offload_kqv=True,  # Keep the KV cache on the GPU as well
                 use_mmap=True,
                 use_mlock=False,
-                verbose=False
+                verbose=False,
+                **llama_kwargs
             )
             
+            # Keep KV state for prompt prefixes so a new turn only prefills
+            # the tokens that changed since the previous analysis
+            cache_mb = self.model_config.llm_prompt_cache_mb
+            if cache_mb > 0 and LlamaRAMCache is not None:
+                self.model.set_cache(LlamaRAMCache(capacity_bytes=cache_mb * 1024 * 1024))
+            
+            self._warm_prompt_prefix()
+            
+            if LlamaGrammar is not None:
+                try:
+                    self.grammar = LlamaGrammar.from_string(ANALYSIS_GRAMMAR, verbose=False)
+                except Exception as e:
+                    logger.warning(f"Could not compile response grammar: {e}")
+            
             self.is_loaded = True
             logger.info(f"Loaded LLM model: {model_path}")
             return True
@@ -82,13 +257,185 @@ class SalesCoachLLM:
             logger.error(f"Failed to load LLM model: {e}")
             return False
     
+    def _context_length(self) -> int:
+        """
+        Context size to allocate for llama.cpp.
+        
+        The KV cache is allocated for the whole context up front, so it is
+        sized for the largest analysis prompt (_get_prompt_turns sends up to
+        1.5 context windows of turns) plus the response rather than the
+        configured maximum. Longer prompts drop their oldest turns.
+        """
+        max_context = self.model_config.llm_context_length
+        if not self.model_config.llm_auto_context:
+            return max_context
+        
+        window = self.coaching_config.conversation_context_window
+        max_turns = window + max(1, window // 2)
+        needed = (
+            PROMPT_PREFIX_TOKEN_BUDGET + max_turns * PROMPT_TURN_TOKEN_BUDGET +
+            PROMPT_TAIL_TOKEN_BUDGET + self.model_config.llm_max_tokens
+        )
+        needed = -(-needed // 256) * 256  # Round up to a multiple of 256
+        return min(max_context, max(1024, needed))
+    
+    def _load_draft_model(self) -> Optional[LlamaModelDraft]:
+        """Load the speculative decoding draft model, if one is configured."""
+        draft_path = self.model_config.llm_draft_model_path
+        if not draft_path:
+            return None
+        
+        if not Path(draft_path).exists():
+            logger.warning(f"Draft model not found, decoding without it: {draft_path}")
+            return None
+        
+        try:
+            draft = Llama(
+                model_path=draft_path,
+                n_ctx=self._context_length(),
+                n_threads=4,
+                n_gpu_layers=-1,
+                n_batch=512,
+                use_mmap=True,
+                verbose=False
+            )
+            logger.info(f"Loaded draft model for speculative decoding: {draft_path}")
+            return LlamaModelDraft(draft, num_pred_tokens=self.model_config.llm_draft_tokens)
+            
+        except Exception as e:
+            logger.warning(f"Failed to load draft model, decoding without it: {e}")
+            return None
+    
+    def _load_vllm(self) -> bool:
+        """Load the model with vLLM (PagedAttention, continuous batching)."""
+        if not VLLM_AVAILABLE:
+            logger.error("vLLM not available. Install with: pip install vllm")
+            return False
+        
+        try:
+            from vllm import LLM, SamplingParams
+            
+            model = self.model_config.llm_model_path or self.model_config.llm_model_name
+            # The static prompt prefix is shared by every analysis, so vLLM's
+            # automatic prefix caching skips its prefill after the first call
+            engine_args = {
+                "model": model,
+                "max_model_len": self.model_config.llm_context_length,
+                "enable_prefix_caching": True
+            }
+            draft_path = self.model_config.llm_draft_model_path
+            if draft_path:
+                try:
+                    self.model = LLM(**engine_args, speculative_config={
+                        "model": draft_path,
+                        "num_speculative_tokens": self.model_config.llm_draft_tokens
+                    })
+                except TypeError:
+                    # Older vLLM releases take the draft as separate arguments
+                    self.model = LLM(
+                        **engine_args,
+                        speculative_model=draft_path,
+                        num_speculative_tokens=self.model_config.llm_draft_tokens
+                    )
+            else:
+                self.model = LLM(**engine_args)
+            self.sampling_params = SamplingParams(
+                max_tokens=self.model_config.llm_max_tokens,
+                temperature=self.model_config.llm_temperature,
+                stop=ANALYSIS_STOP_SEQUENCES
+            )
+            
+            self.is_loaded = True
+            logger.info(f"Loaded LLM model with vLLM: {model}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to load LLM model with vLLM: {e}")
+            return False
+    
+    def _generate(self, prompt: Union[str, List[int]]) -> str:
+        """Run one completion on the loaded backend and return its text."""
+        if self.backend == "vllm":
+            outputs = self.model.generate([prompt], self.sampling_params, use_tqdm=False)
+            return outputs[0].outputs[0].text
+        
+        # Stream so generation can end as soon as the JSON object closes,
+        # instead of decoding trailing text up to max_tokens
+        chunks = []
+        json_end = _JsonObjectEnd()
+        for chunk in self.model(
+            prompt,
+            max_tokens=self.model_config.llm_max_tokens,
+            temperature=self.model_config.llm_temperature,
+            stop=ANALYSIS_STOP_SEQUENCES,
+            grammar=self.grammar,
+            echo=False,
+            stream=True
+        ):
+            text = chunk['choices'][0]['text']
+            chunks.append(text)
+            if json_end.feed(text):
+                break
+        return "".join(chunks)
+    
+    def _warm_prompt_prefix(self) -> None:
+        """
+        Prefill the static prompt prefix once at load time.
+        
+        Every analysis prompt starts with ANALYSIS_PROMPT_PREFIX, so with its
+        KV state already evaluated (and snapshotted into the prompt cache)
+        even the first analysis only prefills the conversation suffix.
+        """
+        try:
+            tokens = self._tokenize(ANALYSIS_PROMPT_PREFIX, add_bos=True)
+            
+            start_time = time.time()
+            self.model.reset()
+            self.model.eval(tokens)
+            if self.model.cache is not None:
+                self.model.cache[tokens] = self.model.save_state()
+            self._prefix_tokens = tokens
+            
+            logger.debug(
+                f"Prefilled {len(tokens)} prompt prefix tokens in {time.time() - start_time:.2f}s"
+            )
+        except Exception as e:
+            logger.warning(f"Could not prefill prompt prefix: {e}")
+    
+    def _tokenize(self, text: str, add_bos: bool = False) -> List[int]:
+        """Tokenize text with the loaded llama.cpp model."""
+        data = text.encode("utf-8")
+        try:
+            return self.model.tokenize(data, add_bos=add_bos, special=True)
+        except TypeError:
+            return self.model.tokenize(data, add_bos=add_bos)  # Older bindings
+    
     def _get_model_path(self) -> Optional[Path]:
         """Get path to the LLM model file."""
         if self.model_config.llm_model_path:
             return Path(self.model_config.llm_model_path)
         
-        # Common locations for Llama models
+        key = (
+            self.model_config.llm_model_name,
+            self.model_config.llm_quant,
+            self.model_config.llm_search_hf_cache
+        )
+        with _model_path_lock:
+            model_path = _model_path_cache.get(key)
+            if model_path is None or not model_path.exists():
+                model_path = self._find_model_path()
+                # Only hits are remembered, so a model downloaded later is found
+                if model_path is not None:
+                    _model_path_cache[key] = model_path
+        
+        return model_path
+    
+    def _find_model_path(self) -> Optional[Path]:
+        """Search the common model locations for a matching GGUF file."""
+        # Common locations for Llama models, preferring the configured
+        # quantization since decoding is bound by the bytes of weights read
         model_patterns = [
+            f"*{self.model_config.llm_model_name}*{self.model_config.llm_quant}*.gguf",
             f"*{self.model_config.llm_model_name}*.gguf",
             f"*llama*3.2*3b*.gguf",
             f"*phi*3.5*mini*.gguf"
@@ -96,16 +443,24 @@ class SalesCoachLLM:
         
         search_dirs = [
             Path("models_cache"),
-            Path.home() / ".cache" / "huggingface" / "hub",
             Path("/usr/local/share/llm-models"),
         ]
         
         for search_dir in search_dirs:
             if search_dir.exists():
                 for pattern in model_patterns:
-                    matches = list(search_dir.glob(pattern))
-                    if matches:
-                        return matches[0]  # Return first match
+                    match = next(search_dir.glob(pattern), None)
+                    if match:
+                        return match
+        
+        # The hub cache keeps files under models--*/snapshots/*/ and can hold
+        # thousands of entries, so it is only walked when asked for
+        hf_cache = Path.home() / ".cache" / "huggingface" / "hub"
+        if self.model_config.llm_search_hf_cache and hf_cache.exists():
+            for pattern in model_patterns:
+                match = next(hf_cache.rglob(pattern), None)
+                if match:
+                    return match
         
         return None
     
@@ -115,7 +470,15 @@ class SalesCoachLLM:
     
     def add_conversation_turn(self, turn: ConversationTurn) -> None:
         """Add a new conversation turn."""
-        self.conversation_state.add_turn(turn)
+        self.add_conversation_turns([turn])
+    
+    def add_conversation_turns(self, turns: List[ConversationTurn]) -> None:
+        """Add a batch of conversation turns, queueing at most one analysis."""
+        if not turns:
+            return
+        
+        for turn in turns:
+            self.conversation_state.add_turn(turn)
         
         # Trigger analysis if conditions are met
         if self._should_analyze_conversation():
@@ -138,69 +501,152 @@ class SalesCoachLLM:
         
         return True
     
+    def _get_prompt_turns(self) -> List[ConversationTurn]:
+        """
+        Get the turns to include in the analysis prompt.
+        
+        The history start only advances in steps of half a context window, so
+        consecutive prompts share the same leading turns and the LLM can reuse
+        the KV cache for them instead of re-prefilling the whole conversation.
+        """
+        turns = self.conversation_state.turns
+        window = self.coaching_config.conversation_context_window
+        
+        if len(turns) <= window:
+            return list(turns)
+        
+        step = max(1, window // 2)
+        start = (len(turns) - window) // step * step
+        return list(islice(turns, start, None))
+    
     def _queue_analysis(self) -> None:
         """Queue conversation for analysis."""
-        analysis_data = {
-            "turns": self.conversation_state.get_recent_turns(
-                self.coaching_config.conversation_context_window
-            ),
+        self.submit_analysis(PRIORITY_PERIODIC)
+    
+    def submit_analysis(self, priority: int = PRIORITY_PERIODIC, notify: bool = True) -> Future:
+        """
+        Queue an analysis of the current conversation for the worker thread.
+        
+        Args:
+            priority: PRIORITY_FORCED requests run ahead of periodic ones
+            notify: Record the result and pass it to the coaching callback
+            
+        Returns:
+            Future resolved with the CoachingResponse (or None)
+        """
+        future: Future = Future()
+        request = {
+            "turns": self._get_prompt_turns(),
             "conversation_state": self.conversation_state,
-            "timestamp": datetime.now()
+            "timestamp": datetime.now(),
+            "seq": next(self._request_seq),
+            "futures": [future],
+            "notify": notify
         }
         
-        self.analysis_queue.append(analysis_data)
+        # A request still waiting is stale now; fold it into this one
+        # instead of queueing behind it
+        while True:
+            try:
+                pending_priority, _, pending = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is _STOP_ANALYSIS:
+                self.analysis_queue.put_nowait((pending_priority, next(self._request_seq), pending))
+                future.set_result(None)
+                return future
+            priority = min(priority, pending_priority)
+            request = self._merge_requests(pending, request)
+            self.skipped_analyses += 1
+        
+        self.analysis_queue.put_nowait((priority, request["seq"], request))
         
         # Start analysis thread if not running
         if not self.is_analyzing:
             self.start_analysis()
+        
+        return future
+    
+    @staticmethod
+    def _merge_requests(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the newer of two requests, answering the callers of both."""
+        older, newer = (a, b) if a["seq"] < b["seq"] else (b, a)
+        newer["futures"] = older["futures"] + newer["futures"]
+        newer["notify"] = older["notify"] or newer["notify"]
+        return newer
+    
+    @staticmethod
+    def _resolve_request(request: Dict[str, Any], response: Optional[CoachingResponse]) -> None:
+        """Hand the result to everyone waiting on a request."""
+        for future in request["futures"]:
+            if not future.done():
+                future.set_result(response)
     
     def start_analysis(self) -> None:
         """Start background analysis thread."""
-        if self.is_analyzing:
-            return
-        
-        self.is_analyzing = True
-        self.analysis_thread = threading.Thread(target=self._analysis_worker)
-        self.analysis_thread.daemon = True
-        self.analysis_thread.start()
+        with self._worker_lock:
+            if self.is_analyzing:
+                return
+            
+            self.is_analyzing = True
+            self.analysis_thread = threading.Thread(target=self._analysis_worker)
+            self.analysis_thread.daemon = True
+            self.analysis_thread.start()
         
         logger.info("Started coaching analysis thread")
     
     def stop_analysis(self) -> None:
         """Stop background analysis thread."""
-        if not self.is_analyzing:
-            return
-        
-        self.is_analyzing = False
+        with self._worker_lock:
+            if not self.is_analyzing:
+                return
+            
+            self.is_analyzing = False
+            self.analysis_queue.put((PRIORITY_STOP, next(self._request_seq), _STOP_ANALYSIS))
         
         if self.analysis_thread and self.analysis_thread.is_alive():
             self.analysis_thread.join(timeout=2.0)
         
+        # Nobody will run what is left; don't keep callers waiting
+        while True:
+            try:
+                _, _, request = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _STOP_ANALYSIS:
+                self._resolve_request(request, None)
+        
         logger.info("Stopped coaching analysis thread")
     
     def _analysis_worker(self) -> None:
         """Background worker for conversation analysis."""
         logger.info("Coaching analysis worker started")
         
-        while self.is_analyzing:
-            if not self.analysis_queue:
-                time.sleep(0.1)
-                continue
+        while True:
+            # Blocks until a request (or the stop sentinel) arrives
+            _, _, analysis_data = self.analysis_queue.get()
+            analysis_data = self._take_latest_analysis(analysis_data)
+            if analysis_data is _STOP_ANALYSIS:
+                break
             
+            coaching_response = None
             try:
-                # Get analysis request
-                analysis_data = self.analysis_queue.pop(0)
-                
-                # Perform analysis
-                coaching_response = self._analyze_conversation(
-                    analysis_data["turns"],
-                    analysis_data["conversation_state"]
-                )
-                
-                if coaching_response:
-                    # Add to conversation state
-                    self.conversation_state.add_coaching(coaching_response)
+                with self._model_lock:
+                    # A request taken before a reset describes the old conversation
+                    if analysis_data["conversation_state"] is not self.conversation_state:
+                        continue
+                    
+                    # Perform analysis
+                    coaching_response = self._analyze_conversation(
+                        analysis_data["turns"],
+                        analysis_data["conversation_state"]
+                    )
                     
+                    if coaching_response and analysis_data["notify"]:
+                        # Add to conversation state
+                        self.conversation_state.add_coaching(coaching_response)
+                
+                if coaching_response and analysis_data["notify"]:
                     # Call callback if set
                     if self.coaching_callback:
                         try:
@@ -210,9 +656,38 @@ class SalesCoachLLM:
                 
             except Exception as e:
                 logger.error(f"Error in analysis worker: {e}")
+            finally:
+                self._resolve_request(analysis_data, coaching_response)
         
         logger.info("Coaching analysis worker stopped")
     
+    def _take_latest_analysis(self, latest: Any) -> Any:
+        """
+        Drain the analysis queue, keeping only the newest request.
+        
+        Requests that piled up during LLM latency all describe the same
+        conversation, and the newest one covers the turns of the older ones,
+        so one decode pass replaces the whole backlog. A stop request wins
+        over any analysis.
+        """
+        skipped = 0
+        while latest is not _STOP_ANALYSIS:
+            try:
+                _, _, newer = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if newer is _STOP_ANALYSIS:
+                self._resolve_request(latest, None)
+                latest = newer
+                break
+            latest = self._merge_requests(latest, newer)
+            skipped += 1
+        
+        if skipped:
+            self.skipped_analyses += skipped
+            logger.debug(f"Coalesced {skipped} stale analysis requests")
+        return latest
+    
     def _analyze_conversation(self, turns: List[ConversationTurn], 
                             conversation_state: ConversationState) -> Optional[CoachingResponse]:
         """Analyze conversation and generate coaching advice."""
@@ -220,24 +695,20 @@ class SalesCoachLLM:
             return None
         
         try:
-            # Create analysis prompt
-            prompt = self._create_analysis_prompt(turns, conversation_state)
+            # Create analysis prompt, as token ids when llama.cpp can take them
+            if self.backend == "llama_cpp" and self._prefix_tokens is not None:
+                prompt = self._create_prompt_tokens(turns, conversation_state)
+            else:
+                prompt = self._create_analysis_prompt(turns, conversation_state)
             
             # Generate response
             start_time = time.time()
-            response = self.model(
-                prompt,
-                max_tokens=self.model_config.llm_max_tokens,
-                temperature=self.model_config.llm_temperature,
-                stop=["<|end|>", "<|user|>", "<|system|>"],
-                echo=False
-            )
+            response_text = self._generate(prompt).strip()
             
             processing_time = time.time() - start_time
             logger.debug(f"LLM processing time: {processing_time:.2f}s")
             
             # Parse response
-            response_text = response['choices'][0]['text'].strip()
             coaching_response = self._parse_coaching_response(response_text, len(turns))
             
             return coaching_response
@@ -248,56 +719,86 @@ class SalesCoachLLM:
     
     def _create_analysis_prompt(self, turns: List[ConversationTurn], 
                               conversation_state: ConversationState) -> str:
-        """Create analysis prompt for the LLM."""
+        """
+        Create analysis prompt for the LLM.
         
-        # Format conversation
-        conversation_text = ""
-        for turn in turns[-10:]:  # Last 10 turns
-            speaker_label = turn.speaker.value
-            conversation_text += f"{speaker_label}: {turn.text}\n"
+        The prompt is laid out as [system + instructions, conversation history,
+        per-call context] so that everything except the tail stays identical
+        between consecutive analyses and hits the prompt cache.
+        """
+        conversation_text = "".join(self._format_turn(turn) for turn in turns)
+        return (
+            ANALYSIS_PROMPT_PREFIX + CONVERSATION_HEADER + conversation_text +
+            self._format_context(conversation_state)
+        )
+    
+    def _create_prompt_tokens(self, turns: List[ConversationTurn],
+                              conversation_state: ConversationState) -> List[int]:
+        """
+        Create the analysis prompt as llama.cpp token ids.
         
-        # Calculate talk ratio
-        talk_ratio = conversation_state.get_talk_ratio()
-        talk_ratio_desc = "balanced"
-        if talk_ratio > 2.0:
-            talk_ratio_desc = "sales rep talking too much"
-        elif talk_ratio < 0.5:
-            talk_ratio_desc = "customer talking much more"
+        Same layout as _create_analysis_prompt, but the prefix and each turn
+        are tokenized once and reused, so an analysis only tokenizes turns
+        added since the previous one plus the context tail.
+        """
+        header = self._cached_tokens(CONVERSATION_HEADER)
+        turn_tokens = [self._cached_tokens(self._format_turn(turn)) for turn in turns]
+        tail = self._tokenize(self._format_context(conversation_state))
         
-        # Current stage context
-        current_stage = conversation_state.current_stage.value
+        # Drop the oldest turns if a long exchange would overflow the context.
+        # The cut is kept while the rest still fits, and a new cut goes down
+        # to half the budget, so the start of the history (and the cached KV
+        # state behind it) does not move with every new turn.
+        budget = (
+            self.model.n_ctx() - self.model_config.llm_max_tokens -
+            len(self._prefix_tokens) - len(header) - len(tail)
+        )
+        total = sum(len(t) for t in turn_tokens)
+        first = 0
+        if total > budget:
+            first = next((i for i, turn in enumerate(turns) if turn is self._history_start), 0)
+            total -= sum(len(t) for t in turn_tokens[:first])
+            if total > budget:
+                while total > budget // 2 and first < len(turn_tokens) - 1:
+                    total -= len(turn_tokens[first])
+                    first += 1
+        self._history_start = turns[first] if first else None
         
-        prompt = f"""<|system|>
-You are an expert sales coach analyzing live sales conversations. Provide structured coaching advice in JSON format.<|end|>
-<|user|>
-Analyze this sales conversation:
-
-CONTEXT:
-- Stage: {current_stage}
-- Talk ratio: {talk_ratio:.1f} ({talk_ratio_desc})
-- Duration: {conversation_state.total_duration/60:.1f} minutes
-
-CONVERSATION:
-{conversation_text}
-
-Provide coaching advice in this exact JSON format:
-{{
-    "analysis": {{
-        "customer_concern": "main concern or null",
-        "conversation_stage": "{current_stage}",
-        "customer_sentiment": "positive|neutral|negative"
-    }},
-    "primary_advice": {{
-        "priority": "HIGH|MEDIUM|LOW",
-        "category": "QUESTIONING|LISTENING|OBJECTION_HANDLING|VALUE_PROPOSITION|CLOSING|RAPPORT_BUILDING",
-        "insight": "brief insight",
-        "suggested_action": "specific action"
-    }},
-    "confidence": 0.8
-}}<|end|>
-<|assistant|>"""
-
-        return prompt
+        tokens = list(self._prefix_tokens)
+        tokens += header
+        for t in turn_tokens[first:]:
+            tokens += t
+        tokens += tail
+        return tokens
+    
+    def _cached_tokens(self, text: str) -> List[int]:
+        """Tokenize a prompt fragment, reusing earlier results (LRU)."""
+        tokens = self._turn_tokens.get(text)
+        if tokens is not None:
+            self._turn_tokens.move_to_end(text)
+            return tokens
+        
+        tokens = self._tokenize(text)
+        self._turn_tokens[text] = tokens
+        if len(self._turn_tokens) > self._turn_tokens_max:
+            self._turn_tokens.popitem(last=False)
+        return tokens
+    
+    @staticmethod
+    def _format_turn(turn: ConversationTurn) -> str:
+        """Format one conversation turn as a prompt line."""
+        return f"{turn.speaker.value}: {turn.text}\n"
+    
+    @staticmethod
+    def _format_context(conversation_state: ConversationState) -> str:
+        """Format the per-call context that closes the prompt."""
+        talk_ratio = conversation_state.get_talk_ratio()
+        return ANALYSIS_CONTEXT_TEMPLATE.format_map({
+            "current_stage": conversation_state.current_stage.value,
+            "talk_ratio": talk_ratio,
+            "talk_ratio_desc": conversation_state.get_talk_ratio_label(talk_ratio),
+            "duration_minutes": conversation_state.total_duration / 60
+        })
     
     def _parse_coaching_response(self, response_text: str, context_window: int) -> Optional[CoachingResponse]:
         """Parse LLM response into structured coaching response."""
@@ -311,89 +812,72 @@ Provide coaching advice in this exact JSON format:
             # Log the raw response for debugging
             logger.debug(f"Raw LLM response: {response_text[:200]}...")
             
-            # Multiple extraction strategies
-            json_text = None
-            
-            # Strategy 1: Look for JSON code blocks
-            if "```json" in response_text:
-                json_text = response_text.split("```json")[1].split("```")[0]
-            elif "```" in response_text:
-                json_text = response_text.split("```")[1].split("```")[0]
-            
-            # Strategy 2: Look for { } blocks
-            if not json_text and "{" in response_text:
-                start = response_text.find("{")
-                end = response_text.rfind("}") + 1
-                if start != -1 and end > start:
-                    json_text = response_text[start:end]
-            
-            # Strategy 3: Use the whole response
-            if not json_text:
-                json_text = response_text
-            
-            json_text = json_text.strip()
-            if not json_text:
-                logger.debug("Empty response after JSON extraction")
-                return None
-            
-            logger.debug(f"Extracted JSON: {json_text[:200]}...")
-            
-            # Parse JSON
-            response_data = json.loads(json_text)
-            
-            # Create analysis object
-            analysis = ConversationAnalysis(
-                customer_concern=response_data["analysis"].get("customer_concern"),
-                sales_rep_approach=response_data["analysis"].get("sales_rep_approach"),
-                conversation_stage=ConversationStage(response_data["analysis"]["conversation_stage"]),
-                key_topics=response_data["analysis"].get("key_topics", []),
-                customer_sentiment=response_data["analysis"].get("customer_sentiment"),
-                engagement_level=response_data["analysis"].get("engagement_level")
-            )
-            
-            # Create primary advice
-            advice_data = response_data["primary_advice"]
-            primary_advice = CoachingAdvice(
-                priority=CoachingPriority(advice_data["priority"]),
-                category=CoachingCategory(advice_data["category"]),
-                insight=advice_data["insight"],
-                suggested_action=advice_data["suggested_action"],
-                example_phrase=advice_data.get("example_phrase"),
-                timing=advice_data.get("timing")
-            )
+            # Grammar-constrained output is exactly the JSON object; without a
+            # grammar (vLLM), trim anything the model wrote around it
+            start = response_text.find("{")
+            if start != -1:
+                response_text = response_text[start:response_text.rfind("}") + 1]
             
-            # Create coaching response
-            coaching_response = CoachingResponse(
-                analysis=analysis,
-                primary_advice=primary_advice,
-                confidence=response_data["confidence"],
+            # Parse and validate in one pass (pydantic-core)
+            parsed = CoachingLLMResponse.model_validate_json(response_text)
+            return CoachingResponse(
+                analysis=parsed.analysis,
+                primary_advice=parsed.primary_advice,
+                confidence=parsed.confidence,
                 context_window=context_window
             )
             
-            return coaching_response
-            
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+        except ValueError as e:
             logger.error(f"Failed to parse coaching response: {e}")
             logger.debug(f"Response text: {response_text}")
             return None
     
-    def force_analysis(self) -> Optional[CoachingResponse]:
-        """Force immediate analysis of current conversation."""
+    def force_analysis(self, timeout: Optional[float] = None) -> Optional[CoachingResponse]:
+        """
+        Force immediate analysis of current conversation.
+        
+        Runs on the analysis worker ahead of any periodic analysis, so it
+        never uses the model concurrently with it.
+        """
         if not self.conversation_state.turns:
             return None
         
-        recent_turns = self.conversation_state.get_recent_turns(
-            self.coaching_config.conversation_context_window
-        )
+        future = self.submit_analysis(PRIORITY_FORCED, notify=False)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning("Forced analysis timed out")
+            return None
+    
+    def reset(self) -> None:
+        """
+        Start a fresh conversation on the already loaded model.
+        
+        Clears the conversation state, the cached turn tokens and the
+        llama.cpp evaluation state; the weights, the tokenized prompt prefix
+        and the prompt cache are kept, so this takes milliseconds instead of
+        a full reload. Waits for an analysis in progress; analyses still
+        queued for the old conversation are answered with None.
+        """
+        with self._model_lock:
+            self.conversation_state = ConversationState(
+                session_id=f"session_{int(time.time())}",
+                started_at=datetime.now()
+            )
+            self._turn_tokens.clear()
+            self._history_start = None
+            
+            if self.backend != "vllm" and self.model is not None:
+                self.model.reset()
         
-        return self._analyze_conversation(recent_turns, self.conversation_state)
+        logger.info("Coaching conversation reset")
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get summary of current conversation."""
         return {
             "session_id": self.conversation_state.session_id,
             "started_at": self.conversation_state.started_at.isoformat(),
-            "total_turns": len(self.conversation_state.turns),
+            "total_turns": self.conversation_state.total_turns,
             "total_duration": self.conversation_state.total_duration,
             "talk_ratio": self.conversation_state.get_talk_ratio(),
             "current_stage": self.conversation_state.current_stage.value,
@@ -406,21 +890,25 @@ Provide coaching advice in this exact JSON format:
         return {
             "is_loaded": self.is_loaded,
             "is_analyzing": self.is_analyzing,
-            "analysis_queue_size": len(self.analysis_queue),
+            "analysis_queue_size": self.analysis_queue.qsize(),
+            "skipped_analyses": self.skipped_analyses,
             "model_config": {
+                "backend": self.backend,
                 "model_name": self.model_config.llm_model_name,
                 "context_length": self.model_config.llm_context_length,
                 "max_tokens": self.model_config.llm_max_tokens,
                 "temperature": self.model_config.llm_temperature
             },
+            "draft_acceptance_rate": self.draft_model.acceptance_rate if self.draft_model else None,
             "conversation_summary": self.get_conversation_summary()
         }
 
 
 def create_coaching_system(model_config: ModelConfig, 
-                         coaching_config: CoachingConfig) -> Optional[SalesCoachLLM]:
+                         coaching_config: CoachingConfig,
+                         session_id: Optional[str] = None) -> Optional[SalesCoachLLM]:
     """Factory function to create coaching system."""
-    coach = SalesCoachLLM(model_config, coaching_config)
+    coach = SalesCoachLLM(model_config, coaching_config, session_id)
     
     if not coach.load_model():
         logger.error("Failed to load LLM model for coaching")
@@ -0,0 +1,78 @@
+"""Speculative decoding with a small draft model for llama.cpp."""
+
+import logging
+import numpy as np
+
+try:
+    from llama_cpp.llama_speculative import LlamaDraftModel
+except ImportError:
+    LlamaDraftModel = object
+
+
+logger = logging.getLogger(__name__)
+
+
+class LlamaModelDraft(LlamaDraftModel):
+    """
+    Draft model that proposes tokens by greedy decoding with a small Llama.
+    
+    The main model verifies all proposed tokens in one forward pass, which
+    pays off on the highly templated coaching JSON. The draft must share the
+    main model's vocabulary. Drafting is switched off if the main model
+    accepts less than min_acceptance of the proposed tokens.
+    """
+    
+    def __init__(self, draft_model, num_pred_tokens: int = 8,
+                 min_acceptance: float = 0.5, warmup_tokens: int = 64):
+        self.draft_model = draft_model
+        self.num_pred_tokens = num_pred_tokens
+        self.min_acceptance = min_acceptance
+        self.warmup_tokens = warmup_tokens
+        self.enabled = True
+        
+        # Acceptance tracking: the previous proposal and where it started
+        self.proposed_tokens = 0
+        self.accepted_tokens = 0
+        self._last_start = 0
+        self._last_draft: np.ndarray = np.empty(0, dtype=np.intc)
+    
+    @property
+    def acceptance_rate(self) -> float:
+        """Fraction of proposed tokens the main model accepted."""
+        return self.accepted_tokens / self.proposed_tokens if self.proposed_tokens else 0.0
+    
+    def __call__(self, input_ids: np.ndarray, /, **kwargs) -> np.ndarray:
+        self._record_acceptance(input_ids)
+        if not self.enabled:
+            return np.empty(0, dtype=np.intc)
+        
+        draft_tokens = []
+        for token in self.draft_model.generate(input_ids.tolist(), temp=0.0):
+            draft_tokens.append(token)
+            if len(draft_tokens) >= self.num_pred_tokens:
+                break
+        
+        self._last_start = len(input_ids)
+        self._last_draft = np.array(draft_tokens, dtype=np.intc)
+        return self._last_draft
+    
+    def _record_acceptance(self, input_ids: np.ndarray) -> None:
+        """Compare the previous proposal with what the main model kept."""
+        n = len(self._last_draft)
+        # At most n drafted plus one sampled token can have been added since
+        # the last call; anything else is a new prompt
+        if not n or not self._last_start < len(input_ids) <= self._last_start + n + 1:
+            return
+        
+        kept = input_ids[self._last_start:self._last_start + n]
+        mismatches = np.flatnonzero(kept != self._last_draft[:len(kept)])
+        self.accepted_tokens += int(mismatches[0]) if mismatches.size else len(kept)
+        self.proposed_tokens += n
+        self._last_draft = self._last_draft[:0]
+        
+        if self.proposed_tokens >= self.warmup_tokens and self.acceptance_rate < self.min_acceptance:
+            self.enabled = False
+            logger.warning(
+                f"Draft model acceptance {self.acceptance_rate:.0%} is below "
+                f"{self.min_acceptance:.0%}, disabling speculative decoding"
+            )
@@ -3,6 +3,8 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, Dict, Any, List
 from pathlib import Path
+import copy
+import functools
 import os
 
 
@@ -16,6 +18,7 @@ class AudioConfig(BaseModel):
     # VAD settings
     vad_threshold: float = Field(default=0.02, description="Voice activity detection threshold")
     vad_model: str = Field(default="silero", description="VAD model to use")
+    vad_onnx: bool = Field(default=True, description="Run Silero VAD with ONNX Runtime instead of PyTorch")
     
     # Buffer settings
     max_buffer_size: int = Field(default=100, description="Maximum audio buffer size")
@@ -39,19 +42,86 @@ class ModelConfig(BaseModel):
     
     # Whisper settings
     whisper_model: str = Field(default="tiny", description="Whisper model size")
-    whisper_device: str = Field(default="auto", description="Device for Whisper inference")
+    whisper_backend: str = Field(
+        default="auto",
+        description="Whisper implementation to try first (auto, whisper_cpp, faster_whisper, whisper, openvino)"
+    )
+    whisper_device: str = Field(default="auto", description="Device for Whisper inference (auto, cuda, mps, cpu)")
+    whisper_gpu_device: int = Field(default=0, description="GPU index for whisper.cpp GPU backends")
+    whisper_quant: str = Field(default="q5_1", description="whisper.cpp weight quantization (q4_0, q5_0, q5_1, q8_0, fp16)")
+    whisper_threads: Optional[int] = Field(default=None, description="whisper.cpp / faster-whisper CPU threads (None = all cores)")
+    whisper_word_timestamps: bool = Field(
+        default=False,
+        description="Compute word-level timestamps (extra alignment pass in openai-whisper)"
+    )
+    whisper_partial_results: bool = Field(
+        default=True,
+        description="Transcribe speech in progress for live partial results"
+    )
+    whisper_compute_type: str = Field(
+        default="auto",
+        description="faster-whisper compute type (auto, int8, int8_float16, int8_float32, float16, float32)"
+    )
     
     # LLM settings
+    llm_backend: str = Field(
+        default="llama_cpp",
+        description="LLM inference engine (llama_cpp, vllm); vllm loads llm_model_path as a Hugging Face model id or directory"
+    )
     llm_model_path: Optional[str] = Field(default=None, description="Path to LLM model file")
     llm_model_name: str = Field(default="llama-3.2-3b", description="LLM model name")
+    llm_search_hf_cache: bool = Field(
+        default=False,
+        description="Also search the Hugging Face hub cache for the LLM model (can be slow)"
+    )
+    llm_quant: str = Field(default="Q4_K_M", description="Preferred GGUF quantization when searching for the model (Q4_K_M, Q5_K_M, Q8_0)")
     llm_context_length: int = Field(default=2048, description="LLM context window size")
+    llm_auto_context: bool = Field(
+        default=True,
+        description="Size the llama.cpp context (and KV cache) to the analysis prompt, up to llm_context_length"
+    )
     llm_max_tokens: int = Field(default=200, description="Maximum tokens for LLM response")
     llm_temperature: float = Field(default=0.3, description="LLM sampling temperature")
+    llm_prompt_cache_mb: int = Field(default=256, description="LLM prompt (KV) cache size in MB, 0 to disable")
+    llm_draft_model_path: Optional[str] = Field(
+        default=None,
+        description="Small draft model for speculative decoding (same tokenizer as the main model)"
+    )
+    llm_draft_tokens: int = Field(default=8, description="Tokens proposed by the draft model per step")
     
     # Diarization settings
     diarization_model: str = Field(default="pyannote", description="Speaker diarization model")
     min_speakers: int = Field(default=2, description="Minimum number of speakers")
     max_speakers: int = Field(default=4, description="Maximum number of speakers")
+    num_speakers: Optional[int] = Field(
+        default=2,
+        description="Exact number of speakers on a call (skips pyannote's speaker-count search), None to estimate"
+    )
+    diarization_fp16: bool = Field(default=True, description="Run diarization in float16 on CUDA")
+    diarization_compile: bool = Field(
+        default=True,
+        description="torch.compile the diarization models on CUDA (slower start-up)"
+    )
+    diarization_segmentation_step: float = Field(
+        default=0.1,
+        description=(
+            "Diarization sliding window step as a fraction of the window duration "
+            "(pyannote default 0.1); larger steps run fewer embedding passes but "
+            "aggregate over less overlap, trading accuracy for speed"
+        )
+    )
+    
+    @validator('num_speakers')
+    def validate_num_speakers(cls, v):
+        if v is not None and v < 1:
+            raise ValueError('Number of speakers must be at least 1')
+        return v
+    
+    @validator('diarization_segmentation_step')
+    def validate_segmentation_step(cls, v):
+        if v <= 0 or v > 1:
+            raise ValueError('Segmentation step must be between 0 and 1')
+        return v
     
     @validator('whisper_model')
     def validate_whisper_model(cls, v):
@@ -60,6 +130,34 @@ class ModelConfig(BaseModel):
             raise ValueError(f'Whisper model must be one of: {valid_models}')
         return v
     
+    @validator('whisper_backend')
+    def validate_whisper_backend(cls, v):
+        valid_backends = ["auto", "whisper_cpp", "faster_whisper", "whisper", "openvino"]
+        if v not in valid_backends:
+            raise ValueError(f'Whisper backend must be one of: {valid_backends}')
+        return v
+    
+    @validator('whisper_quant')
+    def validate_whisper_quant(cls, v):
+        valid_quants = ["q4_0", "q5_0", "q5_1", "q8_0", "fp16"]
+        if v not in valid_quants:
+            raise ValueError(f'Whisper quantization must be one of: {valid_quants}')
+        return v
+    
+    @validator('llm_backend')
+    def validate_llm_backend(cls, v):
+        valid_backends = ["llama_cpp", "vllm"]
+        if v not in valid_backends:
+            raise ValueError(f'LLM backend must be one of: {valid_backends}')
+        return v
+    
+    @validator('llm_quant')
+    def validate_llm_quant(cls, v):
+        valid_quants = ["Q4_K_M", "Q5_K_M", "Q8_0"]
+        if v not in valid_quants:
+            raise ValueError(f'LLM quantization must be one of: {valid_quants}')
+        return v
+    
     @validator('llm_temperature')
     def validate_temperature(cls, v):
         if v < 0 or v > 2:
@@ -73,6 +171,7 @@ class CoachingConfig(BaseModel):
     # Timing settings
     coaching_interval: float = Field(default=30.0, description="Coaching interval in seconds")
     min_transcript_length: int = Field(default=3, description="Minimum transcript turns for coaching")
+    turn_debounce_window: float = Field(default=0.4, description="Seconds to batch new turns before sending them for coaching")
     
     # Coaching behavior
     priority_threshold: float = Field(default=0.7, description="Threshold for high priority advice")
@@ -162,6 +261,22 @@ class SalesCoachConfig(BaseModel):
         
         return cls(**config_data)
     
+    @classmethod
+    def from_validated(cls, config_data: Dict[str, Any]) -> "SalesCoachConfig":
+        """
+        Build a configuration from a model_dump() of a validated one.
+        
+        Skips the validators, so only use it with data that already passed
+        them; raw file contents must go through from_file().
+        """
+        config_data = copy.deepcopy(config_data)
+        sections = {
+            name: field.annotation.model_construct(**config_data[name])
+            for name, field in cls.model_fields.items()
+            if name in config_data
+        }
+        return cls.model_construct(**sections)
+    
     def to_file(self, config_path: Path) -> None:
         """Save configuration to file."""
         config_path.parent.mkdir(parents=True, exist_ok=True)
@@ -184,36 +299,39 @@ class SalesCoachConfig(BaseModel):
         self.system.config_dir.mkdir(parents=True, exist_ok=True)
 
 
+# Environment variable overrides: (variable, config section, key, type cast)
+_ENV_OVERRIDES = (
+    ('SALES_COACH_WHISPER_MODEL', 'models', 'whisper_model', str),
+    ('SALES_COACH_LLM_MODEL_PATH', 'models', 'llm_model_path', str),
+    ('SALES_COACH_AUDIO_DEVICE', 'audio', 'input_device', str),
+    ('SALES_COACH_LOG_LEVEL', 'system', 'log_level', str),
+    ('SALES_COACH_COACHING_INTERVAL', 'coaching', 'coaching_interval', float),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_validated_config(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse and validate a config file once per modification time."""
+    return SalesCoachConfig.from_file(Path(config_path)).model_dump()
+
+
 def load_config(config_path: Optional[Path] = None) -> SalesCoachConfig:
     """Load configuration with environment overrides."""
     
     # Start with defaults
     config = SalesCoachConfig()
     
-    # Load from file if specified
+    # Load from file if specified; an unchanged file is only validated once
     if config_path and config_path.exists():
-        config = SalesCoachConfig.from_file(config_path)
+        config_data = _load_validated_config(
+            str(config_path.resolve()), config_path.stat().st_mtime_ns
+        )
+        config = SalesCoachConfig.from_validated(config_data)
     
     # Environment variable overrides
-    env_overrides = {
-        'SALES_COACH_WHISPER_MODEL': ('models', 'whisper_model'),
-        'SALES_COACH_LLM_MODEL_PATH': ('models', 'llm_model_path'),
-        'SALES_COACH_AUDIO_DEVICE': ('audio', 'input_device'),
-        'SALES_COACH_LOG_LEVEL': ('system', 'log_level'),
-        'SALES_COACH_COACHING_INTERVAL': ('coaching', 'coaching_interval'),
-    }
-    
-    for env_var, (section, key) in env_overrides.items():
-        if env_var in os.environ:
-            value = os.environ[env_var]
-            # Convert types as needed
-            if key in ['coaching_interval']:
-                value = float(value)
-            elif key in ['min_transcript_length', 'max_simultaneous_advice']:
-                value = int(value)
-            elif key in ['store_transcripts', 'store_audio', 'anonymize_logs']:
-                value = value.lower() in ['true', '1', 'yes', 'on']
-                
-            setattr(getattr(config, section), key, value)
+    for env_var, section, key, cast in _ENV_OVERRIDES:
+        value = os.environ.get(env_var)
+        if value is not None:
+            setattr(getattr(config, section), key, cast(value))
     
     return config
\ No newline at end of file
@@ -1,9 +1,16 @@
 """Conversation and coaching models for the sales coach system."""
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, validator
+from typing import List, Optional, Literal, Dict, Any, Deque, Tuple
+from collections import deque
 from datetime import datetime
 from enum import Enum
+from itertools import islice
+
+
+# Bounds on the history a long-running session keeps in memory
+MAX_STATE_TURNS = 2048
+MAX_RECENT_COACHING = 20
 
 
 class Speaker(str, Enum):
@@ -49,8 +56,20 @@ class ConversationTurn(BaseModel):
     confidence: float = Field(default=1.0, ge=0.0, le=1.0, description="Transcription confidence")
     duration: Optional[float] = Field(default=None, description="Duration in seconds")
     
+    # (timestamp, label) of the last formatting; keyed on the timestamp so
+    # copies made with model_copy(update=...) never show a stale label
+    _time_label: Optional[Tuple[datetime, str]] = PrivateAttr(default=None)
+    
+    @property
+    def time_label(self) -> str:
+        """Timestamp as HH:MM:SS, formatted once per timestamp."""
+        cached = self._time_label
+        if cached is None or cached[0] != self.timestamp:
+            cached = self._time_label = (self.timestamp, self.timestamp.strftime('%H:%M:%S'))
+        return cached[1]
+    
     def __str__(self) -> str:
-        return f"[{self.timestamp.strftime('%H:%M:%S')}] {self.speaker.value}: {self.text}"
+        return f"[{self.time_label}] {self.speaker.value}: {self.text}"
 
 
 class ConversationAnalysis(BaseModel):
@@ -120,14 +139,22 @@ class CoachingResponse(BaseModel):
     )
 
 
+# Talk ratio labels for ratio < 0.5, 0.5..2.0 and > 2.0
+TALK_RATIO_LABELS = ("customer talking much more", "balanced", "sales rep talking too much")
+
+
 class ConversationState(BaseModel):
     """Current state of the ongoing conversation."""
     
     session_id: str = Field(description="Unique session identifier")
     started_at: datetime = Field(description="When conversation started")
-    turns: List[ConversationTurn] = Field(
-        default_factory=list,
-        description="All conversation turns"
+    turns: Deque[ConversationTurn] = Field(
+        default_factory=lambda: deque(maxlen=MAX_STATE_TURNS),
+        description=f"Most recent conversation turns (up to {MAX_STATE_TURNS})"
+    )
+    total_turns: int = Field(
+        default=0,
+        description="Number of turns in the conversation, including evicted ones"
     )
     current_stage: ConversationStage = Field(
         default=ConversationStage.DISCOVERY,
@@ -153,14 +180,23 @@ class ConversationState(BaseModel):
     )
     
     # Recent coaching
-    recent_coaching: List[CoachingResponse] = Field(
-        default_factory=list,
+    recent_coaching: Deque[CoachingResponse] = Field(
+        default_factory=lambda: deque(maxlen=MAX_RECENT_COACHING),
         description="Recent coaching responses"
     )
     
+    @validator('turns')
+    def bound_turns(cls, v):
+        return deque(v, maxlen=MAX_STATE_TURNS)
+    
+    @validator('recent_coaching')
+    def bound_recent_coaching(cls, v):
+        return deque(v, maxlen=MAX_RECENT_COACHING)
+    
     def add_turn(self, turn: ConversationTurn) -> None:
         """Add a new conversation turn."""
         self.turns.append(turn)
+        self.total_turns += 1
         
         # Update talk times
         if turn.duration:
@@ -173,7 +209,10 @@ class ConversationState(BaseModel):
     
     def get_recent_turns(self, count: int = 10) -> List[ConversationTurn]:
         """Get the most recent conversation turns."""
-        return self.turns[-count:] if len(self.turns) >= count else self.turns
+        # Walk from the right end so the cost is O(count), not O(len(turns))
+        recent = list(islice(reversed(self.turns), max(0, count)))
+        recent.reverse()
+        return recent
     
     def get_talk_ratio(self) -> float:
         """Get sales rep to customer talk time ratio."""
@@ -181,13 +220,15 @@ class ConversationState(BaseModel):
             return float('inf') if self.sales_rep_talk_time > 0 else 0.0
         return self.sales_rep_talk_time / self.customer_talk_time
     
+    def get_talk_ratio_label(self, talk_ratio: Optional[float] = None) -> str:
+        """Describe the talk ratio (computed if not given) in words."""
+        if talk_ratio is None:
+            talk_ratio = self.get_talk_ratio()
+        return TALK_RATIO_LABELS[(talk_ratio >= 0.5) + (talk_ratio > 2.0)]
+    
     def add_coaching(self, coaching: CoachingResponse) -> None:
-        """Add coaching response and maintain recent history."""
+        """Add coaching response; the deque drops the oldest beyond its bound."""
         self.recent_coaching.append(coaching)
-        
-        # Keep only last 20 coaching responses
-        if len(self.recent_coaching) > 20:
-            self.recent_coaching = self.recent_coaching[-20:]
 
 
 class SpeakerProfile(BaseModel):
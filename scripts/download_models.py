@@ -3,10 +3,13 @@
 
 import os
 import sys
+import time
 from pathlib import Path
+import urllib.error
 import urllib.request
 from typing import Optional
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,46 +20,123 @@ from sales_coach.src.models.config import SalesCoachConfig
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB reads
+PROGRESS_INTERVAL = 0.1  # At most 10 progress updates per second
+
+
+def remote_file_size(url: str) -> Optional[int]:
+    """Size of a remote file from a HEAD request, or None if unknown."""
+    try:
+        request = urllib.request.Request(url, method='HEAD')
+        with urllib.request.urlopen(request, timeout=10) as response:
+            size = response.headers.get('Content-Length')
+            return int(size) if size else None
+    except Exception:
+        return None
+
+
+def is_download_complete(url: str, path: Path) -> bool:
+    """Check an existing file against the remote size (trusted when offline)."""
+    expected = remote_file_size(url)
+    return expected is None or path.stat().st_size == expected
+
 
 def download_file(url: str, destination: Path, description: str = "") -> bool:
-    """Download a file with progress indication."""
+    """Download a file with progress indication, resuming a partial download."""
+    partial = destination.with_name(destination.name + ".part")
     try:
         destination.parent.mkdir(parents=True, exist_ok=True)
         
-        def progress_hook(block_num, block_size, total_size):
-            if total_size > 0:
-                percent = min(100, (block_num * block_size * 100) // total_size)
-                print(f"\r{description}: {percent}%", end='', flush=True)
+        # An incomplete file left at the final name is resumed as well
+        if destination.exists() and not partial.exists():
+            destination.replace(partial)
         
-        logger.info(f"Downloading {description}...")
-        urllib.request.urlretrieve(url, destination, progress_hook)
+        resume_from = partial.stat().st_size if partial.exists() else 0
+        request = urllib.request.Request(url)
+        if resume_from:
+            request.add_header('Range', f'bytes={resume_from}-')
+            logger.info(f"Resuming {description} from {resume_from / 2**20:.0f} MiB...")
+        else:
+            logger.info(f"Downloading {description}...")
+        
+        # Read 1 MiB at a time into one reused buffer; multi-GB models would
+        # otherwise take millions of 8 KiB reads and progress callbacks
+        buffer = memoryview(bytearray(DOWNLOAD_CHUNK_SIZE))
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not resume_from:
+                raise
+            # Range not satisfiable: the partial file is unusable, start over
+            partial.unlink()
+            return download_file(url, destination, description)
+        
+        with response:
+            if resume_from and response.status != 206:
+                resume_from = 0  # Server ignored the range, start over
+            total_size = int(response.headers.get('Content-Length') or 0) + resume_from
+            downloaded = resume_from
+            last_progress = 0.0
+            
+            with open(partial, 'ab' if resume_from else 'wb') as f:
+                while True:
+                    n = response.readinto(buffer)
+                    if not n:
+                        break
+                    f.write(buffer[:n])
+                    downloaded += n
+                    
+                    now = time.monotonic()
+                    if total_size > 0 and now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        percent = min(100, downloaded * 100 // total_size)
+                        print(f"\r{description}: {percent}%", end='', flush=True)
+        
+        if total_size > 0:
+            if downloaded != total_size:
+                raise IOError(f"download ended at {downloaded} of {total_size} bytes")
+            print(f"\r{description}: 100%", end='', flush=True)
+        
+        # Only a complete download gets the final name, so an interrupted
+        # one is not mistaken for an existing model
+        partial.replace(destination)
         print()  # New line after progress
         logger.info(f"Successfully downloaded: {destination}")
         return True
         
     except Exception as e:
+        print()
         logger.error(f"Failed to download {description}: {e}")
+        if partial.exists():
+            logger.info(f"Partial download kept at {partial}; run again to resume")
         return False
 
 
-def download_whisper_model(model_size: str = "base", models_dir: Path = Path("models_cache")) -> bool:
+def download_whisper_model(model_size: str = "base", models_dir: Path = Path("models_cache"),
+                           quant: str = "q5_1") -> bool:
     """Download Whisper model for whisper.cpp."""
     model_filename = f"ggml-{model_size}.bin"
+    if quant != "fp16":
+        model_filename = f"ggml-{model_size}-{quant}.bin"
     model_path = models_dir / model_filename
     
-    if model_path.exists():
-        logger.info(f"Whisper {model_size} model already exists at {model_path}")
-        return True
-    
     # Whisper.cpp model URLs
     base_url = "https://huggingface.co/ggerganov/whisper.cpp/resolve/main"
     model_url = f"{base_url}/{model_filename}"
     
-    return download_file(
-        model_url, 
-        model_path, 
-        f"Whisper {model_size} model"
-    )
+    if model_path.exists() and is_download_complete(model_url, model_path):
+        logger.info(f"Whisper {model_size} model already exists at {model_path}")
+        return True
+    
+    if download_file(model_url, model_path, f"Whisper {model_size} ({quant}) model"):
+        return True
+    
+    # Not every size is published in every quantization
+    if quant != "fp16":
+        logger.info(f"No {quant} build of Whisper {model_size}, downloading fp16 weights")
+        return download_whisper_model(model_size, models_dir, "fp16")
+    
+    return False
 
 
 def download_llama_model(model_name: str = "llama-3.2-3b-instruct", 
@@ -83,7 +163,7 @@ def download_llama_model(model_name: str = "llama-3.2-3b-instruct",
     model_info = model_urls[model_name]
     model_path = models_dir / model_info["filename"]
     
-    if model_path.exists():
+    if model_path.exists() and is_download_complete(model_info["url"], model_path):
         logger.info(f"{model_name} model already exists at {model_path}")
         return True
     
@@ -124,6 +204,9 @@ def main():
     parser.add_argument("--whisper-model", default="base", 
                        choices=["tiny", "base", "small", "medium"],
                        help="Whisper model size to download")
+    parser.add_argument("--whisper-quant", default="q5_1",
+                       choices=["q4_0", "q5_0", "q5_1", "q8_0", "fp16"],
+                       help="Whisper.cpp weight quantization")
     parser.add_argument("--llm-model", default="phi-3.5-mini",
                        choices=["llama-3.2-3b-instruct", "phi-3.5-mini"],
                        help="LLM model to download")
@@ -141,19 +224,25 @@ def main():
     # Create models directory
     args.models_dir.mkdir(parents=True, exist_ok=True)
     
-    success = True
+    tasks = []
     
     # Download Whisper model
     if not args.skip_whisper:
-        success &= download_whisper_model(args.whisper_model, args.models_dir)
+        tasks.append((download_whisper_model, (args.whisper_model, args.models_dir, args.whisper_quant)))
     
     # Download LLM model
     if not args.skip_llm:
-        success &= download_llama_model(args.llm_model, args.models_dir)
+        tasks.append((download_llama_model, (args.llm_model, args.models_dir)))
     
     # Setup VAD model
     if not args.skip_vad:
-        success &= setup_silero_vad()
+        tasks.append((setup_silero_vad, ()))
+    
+    # The downloads are independent and network-bound, so they run side by
+    # side and the total time is bounded by the largest model
+    with ThreadPoolExecutor(max_workers=max(1, len(tasks))) as executor:
+        results = list(executor.map(lambda task: task[0](*task[1]), tasks))
+    success = all(results)
     
     if success:
         logger.info("✅ All models downloaded successfully!")
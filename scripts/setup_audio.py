@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """Script to help set up audio configuration for the sales coach."""
 
+import functools
+import re
+import shutil
 import sys
 from pathlib import Path
 import subprocess
@@ -11,18 +14,55 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sales_coach.src.audio.capture import AudioDeviceManager, AudioTestUtility
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
 from rich.panel import Panel
 from rich.prompt import Confirm, Prompt
 
 
 console = Console()
 
+# Device names that suggest system audio capture (virtual/aggregate devices)
+RECOMMENDED_DEVICE_RE = re.compile(r"aggregate|blackhole|multi|soundflower", re.IGNORECASE)
+
+# Audio MIDI Setup guide, with its markup parsed once at import
+AUDIO_MIDI_GUIDE_PANEL = Panel(Text.from_markup("""[bold blue]Audio MIDI Setup Configuration[/bold blue]
+
+[yellow]1. Open Audio MIDI Setup[/yellow]
+• Press Cmd+Space and type "Audio MIDI Setup"
+• Or go to Applications > Utilities > Audio MIDI Setup
+
+[yellow]2. Create Multi-Output Device (for system audio capture)[/yellow]
+• Click the "+" button (bottom left)
+• Select "Create Multi-Output Device"
+• Check your normal speakers/headphones
+• Check "BlackHole 2ch" (if installed)
+• Right-click and "Use This Device For Sound Output"
+
+[yellow]3. Create Aggregate Device (for combined audio)[/yellow] 
+• Click the "+" button again
+• Select "Create Aggregate Device"
+• Check your microphone (Built-in Microphone)
+• Check "BlackHole 2ch" (if available)
+• This device will capture both mic and system audio
+
+[yellow]4. Test Your Setup[/yellow]
+• Use this script to test: python scripts/setup_audio.py
+• The aggregate device should capture both voices in a call
+
+[green]💡 Tip: If you don't have BlackHole, the system can still work with just your microphone, but it won't capture the other party's audio in calls.[/green]"""), border_style="blue")
+
+
+@functools.lru_cache(maxsize=1)
+def get_device_manager() -> AudioDeviceManager:
+    """Shared device manager; querying PortAudio devices is slow on CoreAudio."""
+    return AudioDeviceManager()
+
 
 def check_blackhole_installation() -> bool:
     """Check if BlackHole is installed."""
     try:
         # Check if BlackHole driver is available
-        device_manager = AudioDeviceManager()
+        device_manager = get_device_manager()
         blackhole_device = device_manager.find_device("blackhole")
         return blackhole_device is not None
     except Exception:
@@ -35,12 +75,15 @@ def install_blackhole():
     console.print("This allows the coach to hear both your voice and the customer's voice")
     
     if Confirm.ask("Would you like to install BlackHole 2ch?"):
+        # Check if Homebrew is installed (PATH lookup, no brew process)
+        if shutil.which("brew") is None:
+            console.print("[red]Homebrew not found![/red]")
+            console.print("Please install Homebrew first: https://brew.sh")
+            return False
+        
         console.print("\n[blue]Installing BlackHole via Homebrew...[/blue]")
         
         try:
-            # Check if Homebrew is installed
-            subprocess.run(["brew", "--version"], check=True, capture_output=True)
-            
             # Install BlackHole
             result = subprocess.run(["brew", "install", "blackhole-2ch"], 
                                  capture_output=True, text=True)
@@ -53,10 +96,6 @@ def install_blackhole():
                 console.print(f"[red]Failed to install BlackHole: {result.stderr}[/red]")
                 return False
                 
-        except subprocess.CalledProcessError:
-            console.print("[red]Homebrew not found![/red]")
-            console.print("Please install Homebrew first: https://brew.sh")
-            return False
         except Exception as e:
             console.print(f"[red]Installation failed: {e}[/red]")
             return False
@@ -68,7 +107,7 @@ def list_audio_devices():
     """List and analyze available audio devices."""
     console.print("\n[blue]Available Audio Devices:[/blue]")
     
-    device_manager = AudioDeviceManager()
+    device_manager = get_device_manager()
     devices = device_manager.get_input_devices()
     
     table = Table()
@@ -78,10 +117,8 @@ def list_audio_devices():
     table.add_column("Sample Rate", justify="center") 
     table.add_column("Recommended", justify="center")
     
-    recommended_patterns = ["aggregate", "blackhole", "multi", "soundflower"]
-    
     for device in devices:
-        is_recommended = any(pattern in device.name.lower() for pattern in recommended_patterns)
+        is_recommended = RECOMMENDED_DEVICE_RE.search(device.name) is not None
         recommendation = "✅ Yes" if is_recommended else "❌ Basic"
         
         table.add_row(
@@ -103,7 +140,7 @@ def list_audio_devices():
 
 def test_audio_device():
     """Interactively test audio devices."""
-    device_manager = AudioDeviceManager()
+    device_manager = get_device_manager()
     devices = device_manager.get_input_devices()
     
     if not devices:
@@ -179,38 +216,12 @@ def test_audio_device():
 
 def create_audio_midi_guide():
     """Show guide for setting up Audio MIDI Setup."""
-    guide = """[bold blue]Audio MIDI Setup Configuration[/bold blue]
-
-[yellow]1. Open Audio MIDI Setup[/yellow]
-• Press Cmd+Space and type "Audio MIDI Setup"
-• Or go to Applications > Utilities > Audio MIDI Setup
-
-[yellow]2. Create Multi-Output Device (for system audio capture)[/yellow]
-• Click the "+" button (bottom left)
-• Select "Create Multi-Output Device"
-• Check your normal speakers/headphones
-• Check "BlackHole 2ch" (if installed)
-• Right-click and "Use This Device For Sound Output"
-
-[yellow]3. Create Aggregate Device (for combined audio)[/yellow] 
-• Click the "+" button again
-• Select "Create Aggregate Device"
-• Check your microphone (Built-in Microphone)
-• Check "BlackHole 2ch" (if available)
-• This device will capture both mic and system audio
-
-[yellow]4. Test Your Setup[/yellow]
-• Use this script to test: python scripts/setup_audio.py
-• The aggregate device should capture both voices in a call
-
-[green]💡 Tip: If you don't have BlackHole, the system can still work with just your microphone, but it won't capture the other party's audio in calls.[/green]"""
-
-    console.print(Panel(guide, border_style="blue"))
+    console.print(AUDIO_MIDI_GUIDE_PANEL)
 
 
 def recommend_best_device():
     """Recommend the best available device.""" 
-    device_manager = AudioDeviceManager()
+    device_manager = get_device_manager()
     best_device = device_manager.get_best_capture_device()
     
     if best_device:
@@ -255,13 +266,14 @@ def main():
             "2. Test audio devices", 
             "3. Find recommended device",
             "4. Show Audio MIDI Setup guide",
-            "5. Exit"
+            "5. Refresh device list",
+            "6. Exit"
         ]
         
         for option in options:
             console.print(f"  {option}")
         
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5"], default="5")
+        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6"], default="6")
         
         if choice == "1":
             list_audio_devices()
@@ -272,6 +284,10 @@ def main():
         elif choice == "4":
             create_audio_midi_guide()
         elif choice == "5":
+            # Pick up devices added since start-up (e.g. after installing BlackHole)
+            get_device_manager.cache_clear()
+            console.print("[green]Device list refreshed[/green]")
+        elif choice == "6":
             console.print("[green]Setup complete! Run 'sales-coach start' to begin.[/green]")
             break
 
@@ -5,6 +5,7 @@ Test audio detection, thresholds, and transcription separately.
 """
 
 import sounddevice as sd
+import math
 import numpy as np
 import time
 import sys
@@ -15,6 +16,13 @@ sys.path.insert(0, '.')
 from sales_coach.src.models.config import load_config
 from sales_coach.src.audio.transcription import WhisperTranscriber
 
+
+def _rms(audio):
+    """RMS level via one dot product, without a squared temporary."""
+    audio = audio.reshape(-1)  # view, sd.rec arrays are C-contiguous
+    return math.sqrt(float(np.dot(audio, audio)) / audio.size)
+
+
 class AudioCaptureTest:
     def __init__(self):
         print("🎙️  AUDIO CAPTURE PIPELINE TEST")
@@ -54,7 +62,7 @@ class AudioCaptureTest:
             test_audio = sd.rec(self.sample_rate, samplerate=self.sample_rate, channels=1, dtype=np.float32)
             sd.wait()
             
-            rms = np.sqrt(np.mean(test_audio**2))
+            rms = _rms(test_audio)
             max_amp = np.max(np.abs(test_audio))
             
             print(f"  Audio test: RMS={rms:.6f}, Max={max_amp:.6f}")
@@ -96,14 +104,14 @@ class AudioCaptureTest:
             if len(chunk) < chunk_size:
                 continue
                 
-            rms = np.sqrt(np.mean(chunk**2))
+            rms = _rms(chunk)
             results = ["✓" if rms > t else "✗" for t in thresholds]
             
             print(f"  {i+1}   | {rms:.5f} | " + " | ".join([f"  {r}  " for r in results]))
         
         print("\nRecommendations:")
         for threshold in thresholds:
-            chunk_count = sum(1 for chunk in chunks if np.sqrt(np.mean(chunk**2)) > threshold)
+            chunk_count = sum(1 for chunk in chunks if _rms(chunk) > threshold)
             if chunk_count >= 2:  # At least 2 chunks triggered
                 print(f"  Threshold {threshold:.3f}: {chunk_count}/5 chunks - Good sensitivity")
                 break
@@ -146,9 +154,9 @@ class AudioCaptureTest:
             sd.wait()
             
             # Check audio quality
-            audio_1d = audio_data.flatten()
-            rms = np.sqrt(np.mean(audio_1d**2))
-            max_amp = np.max(np.abs(audio_1d))
+            audio_1d = audio_data.reshape(-1)
+            rms = _rms(audio_1d)
+            max_amp = max(audio_1d.max(), -audio_1d.min())
             
             print(f"Audio quality: RMS={rms:.6f}, Max={max_amp:.6f}")
             
@@ -219,8 +227,8 @@ class AudioCaptureTest:
             sd.wait()
             
             # Analyze audio
-            audio_1d = audio_data.flatten()
-            rms = np.sqrt(np.mean(audio_1d**2))
+            audio_1d = audio_data.reshape(-1)
+            rms = _rms(audio_1d)
             
             print(f"RMS:{rms:.6f}", end=" ")
             